@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PRICE_BUCKETS = (25, 50, 100, 250, 500, 1000)
+FACET_CACHE_SIZE = 256
+FILTER_KEYS = ('category', 'in_stock', 'max_price', 'min_rating')
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Yield the positions of the set bits in a bitmap, lowest first."""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+def price_bucket(price: float) -> str:
+    """Return the histogram bucket label for a price."""
+    lower = 0
+    for upper in PRICE_BUCKETS:
+        if price < upper:
+            return f"${lower}-{upper}"
+        lower = upper
+    return f"${lower}+"
+
+
+def bucket_labels() -> List[str]:
+    """Return the price histogram labels in ascending order."""
+    labels = []
+    lower = 0
+    for upper in PRICE_BUCKETS:
+        labels.append(f"${lower}-{upper}")
+        lower = upper
+    labels.append(f"${lower}+")
+    return labels
+
+
+def facet_counts(products: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Count products per category, price bucket and stock value, in one pass.
+
+    Use it on the products that are actually shown (e.g. a model-filtered list), so the
+    facets describe the same set as the results.
+    """
+    categories: Dict[str, int] = {}
+    prices: Dict[str, int] = {}
+    stock = {'in_stock': 0, 'out_of_stock': 0}
+    for prod in products:
+        category = prod.get('category', 'Unknown')
+        categories[category] = categories.get(category, 0) + 1
+        bucket = price_bucket(prod.get('price', 0))
+        prices[bucket] = prices.get(bucket, 0) + 1
+        stock['in_stock' if prod.get('in_stock', False) else 'out_of_stock'] += 1
+    return {
+        'category': categories,
+        'price': {label: prices[label] for label in bucket_labels() if label in prices},
+        'stock': stock,
+    }
+
+
+def filter_signature(filters: Dict[str, Any]) -> Tuple:
+    """Return a hashable signature of the structured filters that affect facets."""
+    signature = []
+    for key in FILTER_KEYS:
+        value = filters.get(key)
+        if isinstance(value, str):
+            value = value.strip().lower()
+        signature.append((key, value))
+    return tuple(signature)
+
+
+class FacetIndex:
+    """Bitmap index over the products dataset for filtering and facet counts.
+
+    Each category and in-stock value owns a bitmap (a Python int with one bit per
+    product). Equality filters are answered by intersecting bitmaps; the range
+    filters are then evaluated in a single pass over the surviving products, and
+    the facets are counted over the matches. Results are cached per filter signature.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], cache_size: int = FACET_CACHE_SIZE):
+        self.products = products
+        self.all_bits = (1 << len(products)) - 1
+        self.category_bits: Dict[str, int] = {}
+        self.stock_bits: Dict[bool, int] = {True: 0, False: 0}
+        for idx, prod in enumerate(products):
+            bit = 1 << idx
+            category = str(prod.get('category', '')).lower()
+            self.category_bits[category] = self.category_bits.get(category, 0) | bit
+            self.stock_bits[bool(prod.get('in_stock', False))] |= bit
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+
+    def candidate_bits(self, category: Optional[str] = None, in_stock: Optional[bool] = None) -> int:
+        """Intersect the category and in-stock bitmaps for the given equality filters."""
+        bits = self.all_bits
+        if category:
+            bits &= self.category_bits.get(category.strip().lower(), 0)
+        if in_stock is not None:
+            bits &= self.stock_bits[bool(in_stock)]
+        return bits
+
+    def search(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter products and compute category, price and stock facets in one pass.
+
+        Returns a dict with the matching product ``indices`` (dataset order) and the
+        ``facets`` aggregations over them.
+        """
+        signature = filter_signature(filters)
+        cached = self._cache.get(signature)
+        if cached is not None:
+            self._cache.move_to_end(signature)
+            return cached
+
+        max_price = filters.get('max_price')
+        min_rating = filters.get('min_rating')
+        bits = self.candidate_bits(filters.get('category'), filters.get('in_stock'))
+        indices: List[int] = []
+        for idx in iter_bits(bits):
+            prod = self.products[idx]
+            if max_price is not None and prod.get('price', 0) > max_price:
+                continue
+            if min_rating is not None and prod.get('rating', 0) < min_rating:
+                continue
+            indices.append(idx)
+
+        result = {
+            'indices': indices,
+            'facets': facet_counts(self.products[idx] for idx in indices),
+        }
+        self._cache[signature] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def facets(self, filters: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        """Return only the facet aggregations for the given filters."""
+        return self.search(filters)['facets']
+
+    @staticmethod
+    def bucket_labels() -> List[str]:
+        """Return the price histogram labels in ascending order."""
+        return bucket_labels()
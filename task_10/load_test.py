@@ -0,0 +1,144 @@
+import argparse
+import io
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+import openai
+
+import product_search
+import query_plan
+from stub_server import start_stub_server
+
+QUERIES_FILE = 'queries.txt'
+STAGES = ('load', 'extract', 'filter', 'print', 'total')
+PERCENTILES = (50, 90, 99)
+
+_print_lock = threading.Lock()
+
+
+def load_queries(filepath: str) -> List[str]:
+    """Load the query corpus, one query per non-empty line."""
+    with open(filepath, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of the values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_query(client: openai.OpenAI, query: str, products_path: str) -> Dict[str, float]:
+    """Run one product search end to end and return the duration of each stage in seconds."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    products = product_search.load_products(products_path)
+    timings['load'] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    preferences = product_search.extract_preferences(client, query, products, product_search.get_function_schema())
+    plan = query_plan.plan_query(preferences, {prod.get('category', '') for prod in products})
+    timings['extract'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    filtered = product_search.filter_products(client, products, plan)
+    timings['filter'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    # redirect_stdout swaps a process-wide stream, so printing is serialized
+    with _print_lock, redirect_stdout(io.StringIO()):
+        product_search.print_products(filtered)
+    timings['print'] = time.perf_counter() - mark
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+
+def run_load_test(client: openai.OpenAI, queries: List[str], qps: float, requests: int,
+                  workers: int, products_path: str) -> Dict[str, object]:
+    """Replay the queries at the target rate and collect per-stage timings."""
+    results: List[Dict[str, float]] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def task(query: str) -> None:
+        try:
+            timings = run_query(client, query, products_path)
+            with lock:
+                results.append(timings)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(requests):
+            delay = start + i / qps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, queries[i % len(queries)])
+    elapsed = time.perf_counter() - start
+    return {'results': results, 'errors': errors, 'elapsed': elapsed}
+
+
+def print_report(report: Dict[str, object], target_qps: float) -> None:
+    """Print achieved throughput and latency percentiles per stage."""
+    results = report['results']
+    errors = report['errors']
+    elapsed = report['elapsed']
+    print(f"Requests: {len(results)} ok, {len(errors)} failed in {elapsed:.2f}s")
+    print(f"Throughput: {len(results) / elapsed if elapsed else 0:.2f} req/s (target {target_qps:.2f})")
+    header = f"{'stage':<8}" + ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}"
+    print(header + "   (ms)")
+    for stage in STAGES:
+        values = [timings[stage] for timings in results]
+        row = ''.join(f"{percentile(values, p) * 1000:>10.1f}" for p in PERCENTILES)
+        print(f"{stage:<8}{row}{max(values, default=0) * 1000:>10.1f}")
+    stats = product_search.filter_validator.stats()
+    print(f"Response validation: {stats['responses']} responses, {stats['invalid']} invalid, "
+          f"{stats['repaired']}/{stats['repairs']} repaired, "
+          f"{stats['mean_parse_us'] + stats['mean_validate_us']:.1f} us per response "
+          f"(parse {stats['mean_parse_us']:.1f}, validate {stats['mean_validate_us']:.1f})")
+    for call, tokens in product_search.token_usage.summary().items():
+        print(f"Tokens ({call}): {tokens['calls']} calls, {tokens['estimated_prompt'] / tokens['calls']:.0f} estimated prompt "
+              f"and {tokens['max_tokens'] / tokens['calls']:.0f} max_tokens per call, "
+              f"{tokens['prompt_tokens']} prompt / {tokens['completion_tokens']} completion reported")
+    if errors:
+        print(f"First error: {errors[0]}")
+
+
+def main():
+    """Run a load test of product_search against the local stub server (or a given base URL)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Load-test product_search against a local OpenAI stub.")
+    parser.add_argument('--qps', type=float, default=5.0, help='Target queries per second')
+    parser.add_argument('--requests', type=int, default=50, help='Total number of queries to send')
+    parser.add_argument('--workers', type=int, default=16, help='Maximum concurrent queries')
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='Stub server latency per call')
+    parser.add_argument('--queries', default=os.path.join(here, QUERIES_FILE), help='Query corpus, one per line')
+    parser.add_argument('--base-url', default=None, help='Use an already running server instead of starting the stub')
+    args = parser.parse_args()
+
+    server: Optional[object] = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_stub_server(0, args.latency_ms / 1000)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    client = openai.OpenAI(api_key='stub', base_url=base_url)
+    queries = load_queries(args.queries)
+    report = run_load_test(client, queries, args.qps, args.requests, args.workers,
+                           os.path.join(here, product_search.PRODUCTS_FILE))
+    print_report(report, args.qps)
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
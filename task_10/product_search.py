@@ -1,12 +1,49 @@
+import argparse
 import json
 import os
-from typing import Any, Dict, List, Optional
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
 import openai
 from dotenv import load_dotenv
+from facets import FacetIndex, facet_counts
+from query_plan import PlanExecutor, QueryPlan, plan_query
+from vector_index import VectorIndex
+
+# The schema library, the LLM output validation stage and token budgeting live in task_8
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'task_8'))
+from schema import Schema, ValidationError  # noqa: E402
+from llm_output import ResponseValidator, repair_messages  # noqa: E402
+from token_budget import TokenUsage, count_message_tokens, count_tokens, output_budget, pack, pack_json  # noqa: E402
 
 PRODUCTS_FILE = 'products.json'
 ENV_TOKEN = 'TOKEN'
 MODEL_NAME = 'gpt-4.1-mini'
+FILTER_CACHE_SIZE = 256
+CATALOG_CONTEXT_TOKENS = 1000
+PREFERENCE_MAX_TOKENS = 150
+FILTER_CONTEXT_TOKENS = 8000
+# The filter answer is re-serialized by the model (other spacing, key order), so allow extra room
+FILTER_OUTPUT_SLACK = 1.5
+FILTER_MIN_OUTPUT_TOKENS = 256
+PRODUCT_LIST_SCHEMA = Schema.array(Schema.object({
+    "name": Schema.string().min_length(1),
+    "category": Schema.string(),
+    "price": Schema.number().non_negative(),
+    "rating": Schema.number().min_value(0).max_value(5),
+    "in_stock": Schema.boolean(),
+}).allow_unknown())
+PRODUCT_LIST_DESCRIPTION = "a list of product objects with 'name', 'category', 'price', 'rating' and 'in_stock'"
+
+# Compiled once; also accumulates validation counts and overhead (see load_test.py).
+filter_validator = ResponseValidator('filtered_products', PRODUCT_LIST_SCHEMA)
+# Estimated and reported tokens of every model call, by call name.
+token_usage = TokenUsage()
+
+_filter_cache: "OrderedDict[QueryPlan, List[Dict[str, Any]]]" = OrderedDict()
+_filter_cache_lock = threading.Lock()
 
 
 def load_products(filepath: str) -> List[Dict[str, Any]]:
@@ -15,6 +52,25 @@ def load_products(filepath: str) -> List[Dict[str, Any]]:
         return json.load(f)
 
 
+class ProductCatalog:
+    """A loaded product list with the structures built over it once and reused for every query:
+    the category set, the facet index, the local plan executor (sharing that facet index and
+    keeping its result cache) and the vector index (built on the first semantic search)."""
+
+    def __init__(self, products: List[Dict[str, Any]]):
+        self.products = products
+        self.categories = {prod.get('category', '') for prod in products}
+        self.facet_index = FacetIndex(products)
+        self.executor = PlanExecutor(products, self.facet_index)
+        self._vector_index: Optional[VectorIndex] = None
+
+    @property
+    def vector_index(self) -> VectorIndex:
+        if self._vector_index is None:
+            self._vector_index = VectorIndex(self.products)
+        return self._vector_index
+
+
 def get_openai_client() -> openai.OpenAI:
     """Load API key from environment and return an OpenAI client instance."""
     load_dotenv()
@@ -55,50 +111,149 @@ def prompt_user() -> str:
     return input("> ")
 
 
-def extract_preferences(client: openai.OpenAI, user_query: str, products: List[Dict[str, Any]], function_schema: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Use OpenAI function calling to extract user preferences from natural language."""
+def build_preference_messages(user_query: str, products: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Build the chat messages used to extract preferences from the user query."""
     system_prompt = (
         "You are a helpful assistant that helps users find products from a dataset based on their preferences. "
         "You can filter, sort, and limit the number of products returned. Use the function call to filter, sort, and limit the products. "
         "If the user asks for the 'cheapest', 'most expensive', or 'highest rated' product, sort accordingly and return only the top result (limit: 1). "
         "Return only the matching products."
     )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_query},
+        {"role": "system", "content": f"Here is the product catalog:\n{catalog_context(products)}"}
+    ]
+
+
+def catalog_context(products: List[Dict[str, Any]]) -> str:
+    """Describe the catalog for preference extraction within CATALOG_CONTEXT_TOKENS: all
+    categories, then product names with their category. Prices, ratings and stock are left
+    out, since the model only has to map the query to filter arguments."""
+    categories = sorted({prod.get('category', '') for prod in products} - {''})
+    header = f"Categories: {', '.join(categories)}"
+    lines = [f"- {prod.get('name', '')} ({prod.get('category', '')})" for prod in products]
+    packed = pack(lines, CATALOG_CONTEXT_TOKENS - count_tokens(header))
+    more = f"\n(and {len(lines) - len(packed)} more products)" if len(packed) < len(lines) else ''
+    return '\n'.join([header, *packed]) + more
+
+
+def extract_preferences(client: openai.OpenAI, user_query: str, products: List[Dict[str, Any]], function_schema: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Use OpenAI function calling to extract user preferences from natural language."""
+    messages = build_preference_messages(user_query, products)
+    prompt_tokens = count_message_tokens(messages) + count_tokens(json.dumps(function_schema))
+    max_tokens = output_budget(prompt_tokens, PREFERENCE_MAX_TOKENS)
     response = client.chat.completions.create(
         model=MODEL_NAME,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_query},
-            {"role": "system", "content": f"Here is the product dataset: {json.dumps(products)}"}
-        ],
+        messages=messages,
         functions=function_schema,
-        function_call={"name": "find_products"}
+        function_call={"name": "find_products"},
+        max_tokens=max_tokens
     )
+    token_usage.record('extract', prompt_tokens, max_tokens, response)
     args = response.choices[0].message.function_call.arguments
     return json.loads(args)
 
 
+def extract_preferences_stream(client: openai.OpenAI, user_query: str, products: List[Dict[str, Any]], function_schema: List[Dict[str, Any]], metrics: Dict[str, float]) -> Dict[str, Any]:
+    """Extract user preferences from a streamed function call, recording time to first token in ``metrics``."""
+    start = time.perf_counter()
+    messages = build_preference_messages(user_query, products)
+    prompt_tokens = count_message_tokens(messages) + count_tokens(json.dumps(function_schema))
+    max_tokens = output_budget(prompt_tokens, PREFERENCE_MAX_TOKENS)
+    token_usage.record('extract', prompt_tokens, max_tokens)
+    stream = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        functions=function_schema,
+        function_call={"name": "find_products"},
+        max_tokens=max_tokens,
+        stream=True
+    )
+    parts = []
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        function_call = chunk.choices[0].delta.function_call
+        if function_call and function_call.arguments:
+            if not parts:
+                metrics['time_to_first_token'] = time.perf_counter() - start
+            parts.append(function_call.arguments)
+    metrics['extract_seconds'] = time.perf_counter() - start
+    return json.loads(''.join(parts) or '{}')
+
+
+def plan_preferences(preferences: Dict[str, Any], catalog: ProductCatalog) -> QueryPlan:
+    """Normalize the extracted preferences into a validated query plan, reporting dropped values."""
+    plan = plan_query(preferences, catalog.categories)
+    for issue in plan.issues:
+        print(f"Warning: {issue}")
+    return plan
+
+
 def get_filtered_products(client: openai.OpenAI, products: List[Dict[str, Any]], preferences: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
     """Use OpenAI to filter, sort, and limit products based on extracted preferences."""
     filter_prompt = (
         "You are a helpful assistant that filters, sorts, and limits products from a dataset based on user preferences. "
         "Return only the matching products as a JSON list."
     )
-    filter_response = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=[
-            {"role": "system", "content": filter_prompt},
-            {"role": "user", "content": f"Filter these products: {json.dumps(products)} with preferences: {json.dumps(preferences)}"}
-        ]
-    )
-    result = filter_response.choices[0].message.content
+    packed = pack_json(products, FILTER_CONTEXT_TOKENS)
+    if len(packed) < len(products):
+        print(f"Note: only the first {len(packed)} of {len(products)} products fit in the prompt budget.")
+    products_json = json.dumps(packed)
+    messages = [
+        {"role": "system", "content": filter_prompt},
+        {"role": "user", "content": f"Filter these products: {products_json} with preferences: {json.dumps(preferences)}"}
+    ]
+    # The answer is a subset of the products sent, re-serialized by the model, so size it from them with slack
+    wanted_tokens = max(FILTER_MIN_OUTPUT_TOKENS, int(count_tokens(products_json) * FILTER_OUTPUT_SLACK))
+
+    def complete(chat_messages: List[Dict[str, str]]) -> str:
+        prompt_tokens = count_message_tokens(chat_messages)
+        max_tokens = output_budget(prompt_tokens, wanted_tokens)
+        response = client.chat.completions.create(model=MODEL_NAME, messages=chat_messages, max_tokens=max_tokens)
+        token_usage.record('filter', prompt_tokens, max_tokens, response)
+        return response.choices[0].message.content or ''
+
+    responses = [complete(messages)]
+
+    def repair(content: str, error: str) -> str:
+        responses.append(complete(repair_messages(messages, content, error, PRODUCT_LIST_DESCRIPTION)))
+        return responses[-1]
+
     try:
-        return json.loads(result)
-    except Exception:
-        print("Could not parse the response as JSON. Raw response:")
-        print(result)
+        return filter_validator.parse_with_repair(responses[0], repair)
+    except ValidationError as e:
+        print(f"The response was not a valid product list, even after a repair request: {e.message}")
+        print(responses[-1])
         return None
 
 
+def format_product(idx: int, prod: Dict[str, Any]) -> str:
+    """Format one product as a numbered result line."""
+    name = prod.get('name', 'Unknown')
+    price = prod.get('price', 'N/A')
+    rating = prod.get('rating', 'N/A')
+    in_stock = prod.get('in_stock', False)
+    stock_str = 'In Stock' if in_stock else 'Out of Stock'
+    return f"{idx}. {name} - ${price}, Rating: {rating}, {stock_str}"
+
+
+def filter_products(client: openai.OpenAI, products: List[Dict[str, Any]], plan: QueryPlan) -> Optional[List[Dict[str, Any]]]:
+    """Filter products with the model using the plan's clean arguments, caching results per plan."""
+    with _filter_cache_lock:
+        if plan in _filter_cache:
+            _filter_cache.move_to_end(plan)
+            return _filter_cache[plan]
+    result = get_filtered_products(client, products, plan.as_preferences())
+    if result is not None:
+        with _filter_cache_lock:
+            _filter_cache[plan] = result
+            if len(_filter_cache) > FILTER_CACHE_SIZE:
+                _filter_cache.popitem(last=False)
+    return result
+
+
 def print_products(products: Optional[List[Dict[str, Any]]]) -> None:
     """Print the filtered products in a structured format."""
     print("\nFiltered Products:")
@@ -106,24 +261,90 @@ def print_products(products: Optional[List[Dict[str, Any]]]) -> None:
         print("No products found matching your preferences.")
         return
     for idx, prod in enumerate(products, 1):
-        name = prod.get('name', 'Unknown')
-        price = prod.get('price', 'N/A')
-        rating = prod.get('rating', 'N/A')
-        in_stock = prod.get('in_stock', False)
-        stock_str = 'In Stock' if in_stock else 'Out of Stock'
-        print(f"{idx}. {name} - ${price}, Rating: {rating}, {stock_str}")
+        print(format_product(idx, prod))
+
+
+def stream_products(products: Iterator[Dict[str, Any]], start: float, metrics: Dict[str, float]) -> None:
+    """Print products as they arrive, recording time to first result (from ``start``) in ``metrics``."""
+    print("\nFiltered Products:", flush=True)
+    count = 0
+    for count, prod in enumerate(products, 1):
+        if count == 1:
+            metrics['time_to_first_result'] = time.perf_counter() - start
+        print(format_product(count, prod), flush=True)
+    metrics['total_seconds'] = time.perf_counter() - start
+    if not count:
+        print("No products found matching your preferences.")
+
+
+def print_stream_metrics(metrics: Dict[str, float]) -> None:
+    """Print the latency metrics collected in streaming mode."""
+    print("\nStreaming Metrics:")
+    for key in ('time_to_first_token', 'extract_seconds', 'time_to_first_result', 'total_seconds'):
+        if key in metrics:
+            print(f"{key}: {metrics[key] * 1000:.0f} ms")
+
+
+def print_similar_products(products: List[Dict[str, Any]], matches: List[Any]) -> None:
+    """Print the nearest products found by the offline vector index."""
+    print("\nClosest Matches:")
+    if not matches:
+        print("No similar products found.")
+        return
+    for idx, (product_idx, score) in enumerate(matches, 1):
+        prod = products[product_idx]
+        print(f"{idx}. {prod.get('name', 'Unknown')} ({prod.get('category', 'N/A')}) - similarity {score:.2f}")
+
+
+def print_facets(facets: Dict[str, Dict[str, int]]) -> None:
+    """Print category counts, the price histogram and stock counts."""
+    print("\nFacets:")
+    categories = ', '.join(f"{name} ({count})" for name, count in facets['category'].items())
+    prices = ', '.join(f"{label} ({count})" for label, count in facets['price'].items())
+    stock = facets['stock']
+    print(f"Category: {categories or 'none'}")
+    print(f"Price: {prices or 'none'}")
+    print(f"Stock: In Stock ({stock['in_stock']}), Out of Stock ({stock['out_of_stock']})")
+
+
+def run_streaming(client: openai.OpenAI, catalog: ProductCatalog, function_schema: List[Dict[str, Any]], user_query: str) -> Dict[str, float]:
+    """Stream preference extraction, then print locally filtered products incrementally."""
+    metrics: Dict[str, float] = {}
+    start = time.perf_counter()
+    preferences = extract_preferences_stream(client, user_query, catalog.products, function_schema, metrics)
+    plan = plan_preferences(preferences, catalog)
+    stream_products(catalog.executor.iter_results(plan), start, metrics)
+    print_stream_metrics(metrics)
+    return metrics
 
 
 def main():
     """Main entry point for the product search tool."""
+    parser = argparse.ArgumentParser(description="Search products using natural language.")
+    parser.add_argument('--stream', action='store_true', help='Stream the model response and print locally filtered results incrementally')
+    parser.add_argument('--local', action='store_true', help='Execute the query plan locally instead of filtering with a second model call')
+    args = parser.parse_args()
     try:
         products = load_products(os.path.join(os.path.dirname(__file__), PRODUCTS_FILE))
+        catalog = ProductCatalog(products)
         client = get_openai_client()
         function_schema = get_function_schema()
         user_query = prompt_user()
+        if args.stream:
+            run_streaming(client, catalog, function_schema, user_query)
+            return
         preferences = extract_preferences(client, user_query, products, function_schema)
-        filtered_products = get_filtered_products(client, products, preferences)
+        plan = plan_preferences(preferences, catalog)
+        if args.local:
+            filtered_products = catalog.executor.execute(plan)
+        else:
+            filtered_products = filter_products(client, products, plan)
         print_products(filtered_products)
+        candidates = catalog.facet_index.search(plan.as_preferences())['indices']
+        matches = catalog.vector_index.search(user_query, k=3, candidates=candidates)
+        print_similar_products(products, matches)
+        # Count the products printed above, whichever path (model or local) produced them
+        print_facets(facet_counts(filtered_products or []))
     except Exception as e:
         print(f"Error: {e}")
 
@@ -0,0 +1,210 @@
+import heapq
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from facets import FacetIndex
+
+SORT_FIELDS = ('price', 'rating', 'name')
+SORT_ORDERS = ('asc', 'desc')
+RESULT_CACHE_SIZE = 256
+
+STRATEGY_TOP_K = 'top_k'
+STRATEGY_INDEX = 'index'
+STRATEGY_SCAN = 'scan'
+
+
+class QueryPlanError(ValueError):
+    """Raised when function call arguments cannot be turned into a query plan."""
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Normalized ``find_products`` arguments plus the chosen execution strategy.
+
+    Plans are immutable and hashable, so they double as result cache keys.
+    ``issues`` records what the planner dropped or coerced and is ignored for
+    equality and hashing.
+    """
+
+    category: Optional[str] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    in_stock: Optional[bool] = None
+    keywords: Tuple[str, ...] = ()
+    sort_by: Optional[str] = None
+    sort_order: str = 'asc'
+    limit: Optional[int] = None
+    strategy: str = STRATEGY_SCAN
+    issues: Tuple[str, ...] = field(default=(), compare=False)
+
+    def as_preferences(self) -> Dict[str, Any]:
+        """Return the plan as clean ``find_products`` arguments, omitting unset fields."""
+        prefs: Dict[str, Any] = {}
+        for key in ('category', 'max_price', 'min_rating', 'in_stock', 'sort_by', 'limit'):
+            value = getattr(self, key)
+            if value is not None:
+                prefs[key] = value
+        if self.keywords:
+            prefs['keywords'] = ' '.join(self.keywords)
+        if self.sort_by:
+            prefs['sort_order'] = self.sort_order
+        return prefs
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """Parse a number, allowing a currency symbol and thousands separators ("$1,200").
+    Anything else float() cannot parse ("1.5k", "800 dollars") is rejected, not cut to a prefix."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip().lstrip('$€£').replace(',', ''))
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'yes', '1', 'false', 'no', '0'):
+        return value.strip().lower() in ('true', 'yes', '1')
+    return None
+
+
+def plan_query(arguments: Any, categories: Iterable[str]) -> QueryPlan:
+    """Validate and normalize model function arguments into a ``QueryPlan``.
+
+    Values that can be coerced (``"$800"`` for a price, ``"true"`` for a flag)
+    are converted; values that cannot are dropped and noted in ``issues``.
+    Raises ``QueryPlanError`` if the arguments are not an object at all.
+    """
+    if not isinstance(arguments, dict):
+        raise QueryPlanError(f"Expected an object of find_products arguments, got {type(arguments).__name__}")
+    issues: List[str] = []
+    known = {c.lower(): c for c in categories}
+
+    def number(key: str, minimum: float = 0.0) -> Optional[float]:
+        raw = arguments.get(key)
+        if raw is None:
+            return None
+        value = _to_number(raw)
+        if value is None or value < minimum:
+            issues.append(f"dropped {key}={raw!r}")
+            return None
+        return value
+
+    category = arguments.get('category')
+    if category is not None:
+        canonical = known.get(str(category).strip().lower())
+        if canonical is None:
+            issues.append(f"dropped unknown category={category!r}")
+        category = canonical
+
+    in_stock = arguments.get('in_stock')
+    if in_stock is not None:
+        in_stock = _to_bool(in_stock)
+        if in_stock is None:
+            issues.append(f"dropped in_stock={arguments['in_stock']!r}")
+
+    raw_keywords = arguments.get('keywords') or ''
+    if isinstance(raw_keywords, list):
+        raw_keywords = ' '.join(str(word) for word in raw_keywords)
+    keywords = tuple(sorted(set(re.findall(r"[a-z0-9']+", str(raw_keywords).lower()))))
+
+    sort_by = arguments.get('sort_by')
+    if sort_by is not None:
+        sort_by = str(sort_by).strip().lower()
+        if sort_by not in SORT_FIELDS:
+            issues.append(f"dropped unknown sort_by={arguments['sort_by']!r}")
+            sort_by = None
+    sort_order = str(arguments.get('sort_order') or 'asc').strip().lower()
+    if sort_order not in SORT_ORDERS:
+        issues.append(f"dropped sort_order={arguments['sort_order']!r}")
+        sort_order = 'asc'
+
+    limit_value = number('limit', minimum=1)
+    limit = int(limit_value) if limit_value is not None else None
+
+    if sort_by and limit is not None:
+        strategy = STRATEGY_TOP_K
+    elif category or in_stock is not None:
+        strategy = STRATEGY_INDEX
+    else:
+        strategy = STRATEGY_SCAN
+
+    return QueryPlan(
+        category=category,
+        max_price=number('max_price'),
+        min_rating=number('min_rating'),
+        in_stock=in_stock,
+        keywords=keywords,
+        sort_by=sort_by,
+        sort_order=sort_order if sort_by else 'asc',
+        limit=limit,
+        strategy=strategy,
+        issues=tuple(issues),
+    )
+
+
+class PlanExecutor:
+    """Execute query plans locally against the products, caching results per plan."""
+
+    def __init__(self, products: List[Dict[str, Any]], facet_index: Optional[FacetIndex] = None,
+                 cache_size: int = RESULT_CACHE_SIZE):
+        self.products = products
+        self.facet_index = facet_index or FacetIndex(products)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[QueryPlan, List[Dict[str, Any]]]" = OrderedDict()
+
+    def _candidates(self, plan: QueryPlan) -> Iterator[Dict[str, Any]]:
+        if plan.strategy == STRATEGY_SCAN:
+            rows: Iterable[Dict[str, Any]] = (
+                prod for prod in self.products
+                if (plan.max_price is None or prod.get('price', 0) <= plan.max_price)
+                and (plan.min_rating is None or prod.get('rating', 0) >= plan.min_rating)
+            )
+        else:
+            indices = self.facet_index.search(plan.as_preferences())['indices']
+            rows = (self.products[idx] for idx in indices)
+        for prod in rows:
+            name = prod.get('name', '').lower()
+            if not plan.keywords or any(word in name for word in plan.keywords):
+                yield prod
+
+    def iter_results(self, plan: QueryPlan) -> Iterator[Dict[str, Any]]:
+        """Yield matching products, incrementally unless the plan needs a full sort."""
+        cached = self._cache.get(plan)
+        if cached is not None:
+            self._cache.move_to_end(plan)
+            yield from cached
+            return
+        found = self._candidates(plan)
+        if plan.strategy == STRATEGY_TOP_K:
+            pick = heapq.nlargest if plan.sort_order == 'desc' else heapq.nsmallest
+            found = iter(pick(plan.limit, found, key=lambda prod: prod.get(plan.sort_by, 0)))
+        elif plan.sort_by:
+            found = iter(sorted(found, key=lambda prod: prod.get(plan.sort_by, 0), reverse=plan.sort_order == 'desc'))
+        results = []
+        for prod in found:
+            if plan.limit is not None and len(results) >= plan.limit:
+                break
+            results.append(prod)
+            yield prod
+        self._store(plan, results)
+
+    def execute(self, plan: QueryPlan) -> List[Dict[str, Any]]:
+        """Return all products matching the plan."""
+        return list(self.iter_results(plan))
+
+    def _store(self, plan: QueryPlan, results: List[Dict[str, Any]]) -> None:
+        self._cache[plan] = results
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
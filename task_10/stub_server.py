@@ -0,0 +1,186 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PORT = 8765
+CATEGORY_WORDS = {
+    'electronics': 'Electronics', 'electronic': 'Electronics', 'gadget': 'Electronics',
+    'fitness': 'Fitness', 'workout': 'Fitness', 'exercise': 'Fitness',
+    'kitchen': 'Kitchen', 'appliance': 'Kitchen',
+    'books': 'Books', 'book': 'Books', 'novel': 'Books',
+    'clothing': 'Clothing', 'clothes': 'Clothing', 'shirt': 'Clothing', 'shoes': 'Clothing',
+}
+NUMBER_WORDS = {'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5}
+
+
+def stub_preferences(query: str) -> Dict[str, Any]:
+    """Derive deterministic ``find_products`` arguments from a user query with simple rules."""
+    text = query.lower()
+    prefs: Dict[str, Any] = {}
+    for word, category in CATEGORY_WORDS.items():
+        if re.search(rf"\b{word}\b", text):
+            prefs['category'] = category
+            break
+    price = re.search(r"(?:under|below|less than)\s*\$?(\d+(?:\.\d+)?)", text)
+    if price:
+        prefs['max_price'] = float(price.group(1))
+    rating = re.search(r"rating (?:of |above |over )?(\d(?:\.\d)?)", text)
+    if rating:
+        prefs['min_rating'] = float(rating.group(1))
+    if 'in stock' in text:
+        prefs['in_stock'] = True
+    if 'cheapest' in text:
+        prefs.update(sort_by='price', sort_order='asc', limit=1)
+    elif 'most expensive' in text:
+        prefs.update(sort_by='price', sort_order='desc', limit=1)
+    elif 'highest rated' in text or 'highest rating' in text:
+        prefs.update(sort_by='rating', sort_order='desc', limit=1)
+    count = re.search(r"\b(\d+|one|two|three|four|five)\s+\w+", text)
+    if count and 'sort_by' in prefs:
+        value = count.group(1)
+        prefs['limit'] = int(value) if value.isdigit() else NUMBER_WORDS[value]
+    return prefs
+
+
+def stub_filter(products: List[Dict[str, Any]], prefs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Apply the preferences to the products the same way the real filter prompt asks for."""
+    result = []
+    keywords = [word for word in str(prefs.get('keywords') or '').lower().split() if word]
+    for prod in products:
+        if prefs.get('category') and prod.get('category', '').lower() != str(prefs['category']).lower():
+            continue
+        if prefs.get('max_price') is not None and prod.get('price', 0) > prefs['max_price']:
+            continue
+        if prefs.get('min_rating') is not None and prod.get('rating', 0) < prefs['min_rating']:
+            continue
+        if prefs.get('in_stock') is not None and prod.get('in_stock') != prefs['in_stock']:
+            continue
+        if keywords and not any(word in prod.get('name', '').lower() for word in keywords):
+            continue
+        result.append(prod)
+    if prefs.get('sort_by'):
+        result.sort(key=lambda prod: prod.get(prefs['sort_by'], 0), reverse=prefs.get('sort_order') == 'desc')
+    if prefs.get('limit') is not None:
+        result = result[:prefs['limit']]
+    return result
+
+
+def extract_json_after(text: str, marker: str) -> Optional[Any]:
+    """Decode the JSON value that directly follows ``marker`` in ``text``."""
+    pos = text.find(marker)
+    if pos < 0:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, pos + len(marker))
+        return value
+    except ValueError:
+        return None
+
+
+def completion_message(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the assistant message the stub returns for a chat completion request."""
+    messages = body.get('messages', [])
+    if body.get('functions'):
+        query = next((m['content'] for m in messages if m.get('role') == 'user'), '')
+        arguments = json.dumps(stub_preferences(query))
+        name = body['functions'][0]['name']
+        return {'role': 'assistant', 'content': None, 'function_call': {'name': name, 'arguments': arguments}}
+    content = messages[-1].get('content', '') if messages else ''
+    products = extract_json_after(content, 'Filter these products: ') or []
+    prefs = extract_json_after(content, ' with preferences: ') or {}
+    return {'role': 'assistant', 'content': json.dumps(stub_filter(products, prefs))}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handle ``POST /v1/chat/completions`` with deterministic, optionally streamed responses."""
+
+    latency = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f'Unknown path {self.path}'}})
+            return
+        time.sleep(self.latency)
+        message = completion_message(body)
+        if body.get('stream'):
+            self._send_stream(body, message)
+        else:
+            self._send_json(200, {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', 'stub'),
+                'choices': [{'index': 0, 'message': message, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+            })
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, body: Dict[str, Any], message: Dict[str, Any]) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        if message.get('function_call'):
+            text = message['function_call']['arguments']
+            deltas = [{'function_call': {'name': message['function_call']['name'], 'arguments': ''}}]
+            deltas += [{'function_call': {'arguments': text[i:i + 8]}} for i in range(0, len(text), 8)]
+        else:
+            text = message['content']
+            deltas = [{'role': 'assistant', 'content': ''}]
+            deltas += [{'content': text[i:i + 16]} for i in range(0, len(text), 16)]
+        for delta in deltas:
+            chunk = {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model', 'stub'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def start_stub_server(port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub server in a daemon thread and return it; ``port=0`` picks a free port."""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Run the stub OpenAI-compatible server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server for product_search.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Artificial latency added to every response')
+    args = parser.parse_args()
+    server = start_stub_server(args.port, args.latency_ms / 1000)
+    print(f"Stub server listening on http://127.0.0.1:{server.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
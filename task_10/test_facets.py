@@ -0,0 +1,64 @@
+import unittest
+
+from facets import FacetIndex, bucket_labels, facet_counts, filter_signature, iter_bits, price_bucket
+
+PRODUCTS = [
+    {'name': 'Smart Watch', 'category': 'Electronics', 'price': 199.99, 'rating': 4.6, 'in_stock': True},
+    {'name': 'Wireless Headphones', 'category': 'Electronics', 'price': 99.99, 'rating': 4.4, 'in_stock': False},
+    {'name': 'Yoga Mat', 'category': 'Fitness', 'price': 19.99, 'rating': 4.3, 'in_stock': True},
+    {'name': 'Treadmill', 'category': 'Fitness', 'price': 1299.0, 'rating': 4.0, 'in_stock': True},
+]
+
+
+class TestHelpers(unittest.TestCase):
+    def test_iter_bits(self):
+        self.assertEqual(list(iter_bits(0b101001)), [0, 3, 5])
+        self.assertEqual(list(iter_bits(0)), [])
+
+    def test_price_bucket(self):
+        self.assertEqual(price_bucket(0), '$0-25')
+        self.assertEqual(price_bucket(25), '$25-50')
+        self.assertEqual(price_bucket(999.99), '$500-1000')
+        self.assertEqual(price_bucket(1000), '$1000+')
+        self.assertEqual(bucket_labels()[0], '$0-25')
+        self.assertEqual(bucket_labels()[-1], '$1000+')
+
+    def test_filter_signature_normalizes_strings(self):
+        self.assertEqual(filter_signature({'category': ' Fitness '}), filter_signature({'category': 'fitness'}))
+        self.assertNotEqual(filter_signature({'max_price': 10}), filter_signature({}))
+
+    def test_facet_counts(self):
+        facets = facet_counts(PRODUCTS[1:3])
+        self.assertEqual(facets['category'], {'Electronics': 1, 'Fitness': 1})
+        self.assertEqual(list(facets['price']), ['$0-25', '$50-100'])
+        self.assertEqual(facets['stock'], {'in_stock': 1, 'out_of_stock': 1})
+        self.assertEqual(facet_counts([])['category'], {})
+
+
+class TestFacetIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FacetIndex(PRODUCTS)
+
+    def test_equality_filters(self):
+        self.assertEqual(self.index.search({'category': 'electronics'})['indices'], [0, 1])
+        self.assertEqual(self.index.search({'category': 'Electronics', 'in_stock': True})['indices'], [0])
+        self.assertEqual(self.index.search({'category': 'Toys'})['indices'], [])
+
+    def test_range_filters_and_facets(self):
+        result = self.index.search({'max_price': 200, 'min_rating': 4.3})
+        self.assertEqual(result['indices'], [0, 1, 2])
+        self.assertEqual(result['facets'], facet_counts(PRODUCTS[:3]))
+
+    def test_results_are_cached(self):
+        first = self.index.search({'category': 'Fitness'})
+        self.assertIs(self.index.search({'category': ' fitness'}), first)
+
+    def test_cache_is_bounded(self):
+        index = FacetIndex(PRODUCTS, cache_size=2)
+        for price in (10, 20, 30):
+            index.search({'max_price': price})
+        self.assertEqual(len(index._cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+
+from query_plan import (
+    STRATEGY_INDEX,
+    STRATEGY_SCAN,
+    STRATEGY_TOP_K,
+    PlanExecutor,
+    QueryPlanError,
+    _to_bool,
+    _to_number,
+    plan_query,
+)
+
+CATEGORIES = ['Electronics', 'Fitness', 'Books']
+PRODUCTS = [
+    {'name': 'Smart Watch', 'category': 'Electronics', 'price': 199.99, 'rating': 4.6, 'in_stock': True},
+    {'name': 'Wireless Headphones', 'category': 'Electronics', 'price': 99.99, 'rating': 4.4, 'in_stock': False},
+    {'name': 'Portable Charger', 'category': 'Electronics', 'price': 29.99, 'rating': 4.2, 'in_stock': True},
+    {'name': 'Yoga Mat', 'category': 'Fitness', 'price': 19.99, 'rating': 4.3, 'in_stock': True},
+    {'name': 'Treadmill', 'category': 'Fitness', 'price': 899.99, 'rating': 4.0, 'in_stock': True},
+    {'name': 'Cookbook', 'category': 'Books', 'price': 24.99, 'rating': 4.8, 'in_stock': True},
+]
+
+
+class TestToNumber(unittest.TestCase):
+    def test_numbers(self):
+        self.assertEqual(_to_number(5), 5.0)
+        self.assertEqual(_to_number(4.5), 4.5)
+
+    def test_currency_and_separators(self):
+        self.assertEqual(_to_number('$800'), 800.0)
+        self.assertEqual(_to_number('$1,200'), 1200.0)
+        self.assertEqual(_to_number(' 99.5 '), 99.5)
+
+    def test_scientific_notation_is_parsed_whole(self):
+        self.assertEqual(_to_number('1e3'), 1000.0)
+
+    def test_unparseable_strings_are_rejected(self):
+        for value in ('1.5k', '800 dollars', 'cheap', '', 'nan', 'inf'):
+            with self.subTest(value=value):
+                self.assertIsNone(_to_number(value))
+
+    def test_other_types_are_rejected(self):
+        self.assertIsNone(_to_number(True))
+        self.assertIsNone(_to_number(None))
+        self.assertIsNone(_to_number([1]))
+        self.assertIsNone(_to_number(float('inf')))
+
+
+class TestToBool(unittest.TestCase):
+    def test_values(self):
+        self.assertIs(_to_bool(True), True)
+        self.assertIs(_to_bool('Yes'), True)
+        self.assertIs(_to_bool(' false '), False)
+        self.assertIs(_to_bool('0'), False)
+        self.assertIsNone(_to_bool('maybe'))
+        self.assertIsNone(_to_bool(1))
+
+
+class TestPlanQuery(unittest.TestCase):
+    def test_non_dict_arguments_raise(self):
+        for arguments in (None, [], 'category=Books', 3):
+            with self.subTest(arguments=arguments):
+                with self.assertRaises(QueryPlanError):
+                    plan_query(arguments, CATEGORIES)
+
+    def test_coerces_values(self):
+        plan = plan_query({'category': 'electronics', 'max_price': '$1,200', 'min_rating': '4',
+                           'in_stock': 'true', 'limit': '3'}, CATEGORIES)
+        self.assertEqual(plan.category, 'Electronics')
+        self.assertEqual(plan.max_price, 1200.0)
+        self.assertEqual(plan.min_rating, 4.0)
+        self.assertIs(plan.in_stock, True)
+        self.assertEqual(plan.limit, 3)
+        self.assertEqual(plan.issues, ())
+
+    def test_drops_unparseable_values_with_issues(self):
+        plan = plan_query({'max_price': '1.5k', 'category': 'Toys', 'in_stock': 'maybe',
+                           'sort_by': 'color', 'sort_order': 'up'}, CATEGORIES)
+        self.assertIsNone(plan.max_price)
+        self.assertIsNone(plan.category)
+        self.assertIsNone(plan.in_stock)
+        self.assertIsNone(plan.sort_by)
+        self.assertEqual(plan.sort_order, 'asc')
+        self.assertEqual(len(plan.issues), 5)
+        self.assertIn("dropped max_price='1.5k'", plan.issues)
+
+    def test_fractional_limit_below_one_is_dropped(self):
+        plan = plan_query({'limit': 0.5}, CATEGORIES)
+        self.assertIsNone(plan.limit)
+        self.assertEqual(plan.issues, ('dropped limit=0.5',))
+
+    def test_negative_price_is_dropped(self):
+        plan = plan_query({'max_price': -5}, CATEGORIES)
+        self.assertIsNone(plan.max_price)
+        self.assertEqual(len(plan.issues), 1)
+
+    def test_huge_limit_is_kept(self):
+        plan = plan_query({'sort_by': 'price', 'limit': 1e18}, CATEGORIES)
+        self.assertEqual(plan.limit, 10 ** 18)
+        self.assertEqual(plan.strategy, STRATEGY_TOP_K)
+
+    def test_keywords_are_normalized(self):
+        plan = plan_query({'keywords': ['Yoga', 'mat', 'yoga']}, CATEGORIES)
+        self.assertEqual(plan.keywords, ('mat', 'yoga'))
+        self.assertEqual(plan, plan_query({'keywords': 'MAT yoga'}, CATEGORIES))
+
+    def test_strategies(self):
+        self.assertEqual(plan_query({'sort_by': 'rating', 'limit': 2}, CATEGORIES).strategy, STRATEGY_TOP_K)
+        self.assertEqual(plan_query({'category': 'Books'}, CATEGORIES).strategy, STRATEGY_INDEX)
+        self.assertEqual(plan_query({'in_stock': False}, CATEGORIES).strategy, STRATEGY_INDEX)
+        self.assertEqual(plan_query({'max_price': 50}, CATEGORIES).strategy, STRATEGY_SCAN)
+
+    def test_plans_are_hashable_and_ignore_issues(self):
+        plan = plan_query({'category': 'Books', 'sort_order': 'sideways'}, CATEGORIES)
+        self.assertEqual(plan, plan_query({'category': 'books'}, CATEGORIES))
+        self.assertEqual(len({plan, plan_query({'category': 'books'}, CATEGORIES)}), 1)
+
+    def test_as_preferences(self):
+        plan = plan_query({'category': 'fitness', 'sort_by': 'price', 'keywords': 'mat'}, CATEGORIES)
+        self.assertEqual(plan.as_preferences(),
+                         {'category': 'Fitness', 'sort_by': 'price', 'keywords': 'mat', 'sort_order': 'asc'})
+
+
+class TestPlanExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = PlanExecutor(PRODUCTS)
+
+    def names(self, arguments):
+        return [prod['name'] for prod in self.executor.execute(plan_query(arguments, CATEGORIES))]
+
+    def test_scan(self):
+        self.assertEqual(self.names({'max_price': 30, 'min_rating': 4.3}), ['Yoga Mat', 'Cookbook'])
+
+    def test_index(self):
+        self.assertEqual(self.names({'category': 'Electronics', 'in_stock': True}), ['Smart Watch', 'Portable Charger'])
+
+    def test_top_k(self):
+        self.assertEqual(self.names({'sort_by': 'price', 'sort_order': 'desc', 'limit': 2}), ['Treadmill', 'Smart Watch'])
+        self.assertEqual(self.names({'sort_by': 'rating', 'limit': 1}), ['Treadmill'])
+
+    def test_huge_limit_returns_every_match(self):
+        self.assertEqual(len(self.names({'sort_by': 'price', 'limit': 1e18})), len(PRODUCTS))
+
+    def test_sort_without_limit(self):
+        self.assertEqual(self.names({'category': 'Fitness', 'sort_by': 'price'}), ['Yoga Mat', 'Treadmill'])
+
+    def test_keywords(self):
+        self.assertEqual(self.names({'category': 'fitness', 'keywords': 'yoga mat'}), ['Yoga Mat'])
+
+    def test_results_are_cached_per_plan(self):
+        plan = plan_query({'category': 'Books'}, CATEGORIES)
+        first = self.executor.execute(plan)
+        self.assertIs(self.executor._cache[plan], self.executor._cache[plan_query({'category': 'books'}, CATEGORIES)])
+        self.assertEqual(self.executor.execute(plan), first)
+
+    def test_iter_results_yields_incrementally(self):
+        results = self.executor.iter_results(plan_query({}, CATEGORIES))
+        self.assertEqual(next(results)['name'], 'Smart Watch')
+
+
+if __name__ == '__main__':
+    unittest.main()
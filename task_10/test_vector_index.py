@@ -0,0 +1,107 @@
+import math
+import os
+import tempfile
+import unittest
+
+from vector_index import VectorIndex, dot, hashed_ngram_vector, normalize, tokenize
+
+PRODUCTS = [
+    {'name': 'Yoga Mat', 'category': 'Fitness'},
+    {'name': 'Running Shoes', 'category': 'Fitness'},
+    {'name': 'Wireless Headphones', 'category': 'Electronics'},
+    {'name': 'Smart Watch', 'category': 'Electronics'},
+    {'name': 'Cookbook', 'category': 'Books'},
+]
+
+
+def catalog(size: int):
+    words = ['yoga', 'mat', 'running', 'shoes', 'wireless', 'headphones', 'smart', 'watch', 'cook', 'book']
+    return [{'name': f"{words[i % 10]} {words[(i * 7) % 10]} {i}", 'category': f"c{i % 5}"} for i in range(size)]
+
+
+class TestVectors(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Men's T-Shirt, 2x"), ['men', 's', 't', 'shirt', '2x'])
+
+    def test_vectors_are_normalized_and_stable(self):
+        vec = hashed_ngram_vector('yoga mat')
+        self.assertAlmostEqual(math.sqrt(sum(x * x for x in vec.values())), 1.0)
+        self.assertEqual(vec, hashed_ngram_vector('Yoga  MAT'))
+        self.assertAlmostEqual(dot(vec, vec), 1.0)
+
+    def test_normalize_zero_vector(self):
+        self.assertEqual(normalize({}), {})
+
+    def test_shared_ngrams_make_words_similar(self):
+        run = hashed_ngram_vector('running')
+        self.assertGreater(dot(run, hashed_ngram_vector('runs')), dot(run, hashed_ngram_vector('cookbook')))
+
+
+class TestBruteForceSearch(unittest.TestCase):
+    def setUp(self):
+        self.index = VectorIndex(PRODUCTS)
+
+    def test_no_ivf_for_small_catalogs(self):
+        self.assertEqual(self.index.centroids, [])
+
+    def test_best_match_first(self):
+        matches = self.index.search('yoga mat', k=2)
+        self.assertEqual(matches[0][0], 0)
+        self.assertEqual(len(matches), 2)
+        self.assertGreaterEqual(matches[0][1], matches[1][1])
+
+    def test_candidates_restrict_results(self):
+        matches = self.index.search('yoga mat', k=3, candidates=[2, 3])
+        self.assertEqual({idx for idx, _ in matches}, {2, 3})
+        self.assertEqual(self.index.search('yoga', candidates=[]), [])
+
+
+class TestIvfSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.products = catalog(1200)
+        cls.index = VectorIndex(cls.products)
+
+    def test_ivf_is_built_for_large_catalogs(self):
+        self.assertTrue(self.index.centroids)
+        self.assertEqual(sorted(idx for ids in self.index.lists for idx in ids), list(range(len(self.products))))
+
+    def test_search_returns_k_matches(self):
+        self.assertEqual(len(self.index.search('yoga mat', k=5)), 5)
+
+    def test_large_candidate_set_is_respected(self):
+        allowed = set(range(0, 1200, 2))
+        matches = self.index.search('smart watch', k=10, candidates=allowed)
+        self.assertEqual(len(matches), 10)
+        self.assertTrue(all(idx in allowed for idx, _ in matches))
+
+    def test_small_candidate_set_is_scored_directly(self):
+        matches = self.index.search('smart watch', k=5, candidates=[3, 7, 11])
+        self.assertEqual({idx for idx, _ in matches}, {3, 7, 11})
+
+    def test_save_and_load_keep_the_ivf(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            self.index.save(path)
+            loaded = VectorIndex.load(path, self.products)
+            self.assertEqual(len(loaded.centroids), len(self.index.centroids))
+            self.assertEqual(loaded.lists, self.index.lists)
+            self.assertEqual(loaded.search('yoga mat', k=3), self.index.search('yoga mat', k=3))
+        finally:
+            os.remove(path)
+
+    def test_load_rebuilds_for_another_dataset(self):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            self.index.save(path)
+            loaded = VectorIndex.load(path, PRODUCTS)
+            self.assertEqual(len(loaded.vectors), len(PRODUCTS))
+            self.assertEqual(loaded.centroids, [])
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
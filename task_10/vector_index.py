@@ -0,0 +1,154 @@
+import json
+import math
+import re
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+VECTOR_DIM = 512
+NGRAM_SIZE = 3
+IVF_MIN_PRODUCTS = 1000
+KMEANS_ITERATIONS = 10
+DEFAULT_NPROBE = 4
+BRUTE_FORCE_CANDIDATES = 500
+
+Vector = Dict[int, float]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase the text and split it into alphanumeric words."""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def hashed_ngram_vector(text: str, dim: int = VECTOR_DIM) -> Vector:
+    """Embed text as a sparse, L2-normalized vector of hashed words and character n-grams.
+
+    Character n-grams are taken per padded word, so "runs" and "running" share
+    features. Hashing uses crc32, which is stable across processes and runs.
+    """
+    vec: Vector = {}
+    for word in tokenize(text):
+        features = [f"w:{word}"]
+        padded = f"#{word}#"
+        features.extend(padded[i:i + NGRAM_SIZE] for i in range(max(1, len(padded) - NGRAM_SIZE + 1)))
+        for feature in features:
+            h = zlib.crc32(feature.encode('utf-8'))
+            slot = h % dim
+            vec[slot] = vec.get(slot, 0.0) + (1.0 if (h >> 16) & 1 else -1.0)
+    return normalize(vec)
+
+
+def normalize(vec: Vector) -> Vector:
+    """Return the vector scaled to unit length (zero vectors are returned unchanged)."""
+    norm = math.sqrt(sum(x * x for x in vec.values()))
+    return {i: x / norm for i, x in vec.items() if x} if norm else vec
+
+
+def dot(a: Vector, b: Vector) -> float:
+    """Return the dot product of two sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(x * b.get(i, 0.0) for i, x in a.items())
+
+
+def product_text(prod: Dict[str, Any]) -> str:
+    """Return the text that represents a product in the index."""
+    return f"{prod.get('name', '')} {prod.get('category', '')}"
+
+
+class VectorIndex:
+    """Offline nearest-neighbour index over product names and categories.
+
+    Small catalogs are searched brute force. Once the catalog reaches
+    ``IVF_MIN_PRODUCTS`` an inverted-file (IVF) index is built: products are
+    clustered with k-means and a query only scores the ``nprobe`` closest lists.
+    ``embed`` can be replaced with any local CPU embedding function that returns
+    normalized sparse vectors; no network calls are made.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], embed: Callable[[str], Vector] = hashed_ngram_vector,
+                 vectors: Optional[List[Vector]] = None, centroids: Optional[List[Vector]] = None,
+                 lists: Optional[List[List[int]]] = None):
+        self.products = products
+        self.embed = embed
+        self.vectors = vectors if vectors is not None else [embed(product_text(p)) for p in products]
+        self.centroids: List[Vector] = centroids or []
+        self.lists: List[List[int]] = lists or []
+        if len(products) >= IVF_MIN_PRODUCTS and not self.centroids:
+            self.build_ivf()
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = KMEANS_ITERATIONS) -> None:
+        """Cluster the vectors with spherical k-means and build the inverted lists."""
+        n = len(self.vectors)
+        if n == 0:
+            return
+        n_lists = n_lists or max(1, int(math.sqrt(n)))
+        step = max(1, n // n_lists)
+        centroids = [dict(self.vectors[i]) for i in range(0, n, step)][:n_lists]
+        assignment: List[int] = []
+        for _ in range(iterations):
+            assignment = [self._closest(vec, centroids) for vec in self.vectors]
+            sums: List[Vector] = [{} for _ in centroids]
+            for vec, c in zip(self.vectors, assignment):
+                row = sums[c]
+                for i, x in vec.items():
+                    row[i] = row.get(i, 0.0) + x
+            centroids = [normalize(row) if row else centroids[c] for c, row in enumerate(sums)]
+        self.centroids = centroids
+        self.lists = [[] for _ in centroids]
+        for idx, c in enumerate(assignment):
+            self.lists[c].append(idx)
+
+    @staticmethod
+    def _closest(vec: Vector, centroids: List[Vector]) -> int:
+        return max(range(len(centroids)), key=lambda c: dot(vec, centroids[c]))
+
+    def search(self, query: str, k: int = 5, candidates: Optional[Iterable[int]] = None,
+               nprobe: int = DEFAULT_NPROBE) -> List[Tuple[int, float]]:
+        """Return the ``k`` nearest products to the query as ``(index, score)`` pairs.
+
+        ``candidates`` restricts the search to product indices that already passed
+        the structured filters (e.g. ``FacetIndex.search(...)['indices']``). With an
+        IVF index, up to ``BRUTE_FORCE_CANDIDATES`` candidates are scored directly;
+        larger candidate sets are intersected with the probed lists, and further
+        lists are probed until ``k`` candidates are found.
+        """
+        qvec = self.embed(query)
+        allowed = set(candidates) if candidates is not None else None
+        if self.centroids and (allowed is None or len(allowed) > BRUTE_FORCE_CANDIDATES):
+            ranked = sorted(range(len(self.centroids)), key=lambda c: -dot(qvec, self.centroids[c]))
+            pool: List[int] = []
+            for probed, c in enumerate(ranked):
+                if probed >= nprobe and len(pool) >= k:
+                    break
+                pool.extend(idx for idx in self.lists[c] if allowed is None or idx in allowed)
+        elif allowed is not None:
+            pool = sorted(allowed)
+        else:
+            pool = list(range(len(self.vectors)))
+        scored = [(idx, dot(qvec, self.vectors[idx])) for idx in pool]
+        scored.sort(key=lambda item: -item[1])
+        return scored[:k]
+
+    def save(self, filepath: str) -> None:
+        """Write the product vectors and the IVF centroids and lists to a JSON file,
+        so the index can be reloaded offline without re-running k-means."""
+        with open(filepath, 'w') as f:
+            json.dump({'vectors': self.vectors, 'centroids': self.centroids, 'lists': self.lists}, f)
+
+    @classmethod
+    def load(cls, filepath: str, products: List[Dict[str, Any]],
+             embed: Callable[[str], Vector] = hashed_ngram_vector) -> "VectorIndex":
+        """Load an index saved with ``save``; rebuild it if the file does not match the dataset."""
+        try:
+            with open(filepath, 'r') as f:
+                data = json.load(f)
+            vectors = [{int(i): x for i, x in vec.items()} for vec in data['vectors']]
+            centroids = [{int(i): x for i, x in vec.items()} for vec in data.get('centroids', [])]
+            lists = [[int(idx) for idx in ids] for ids in data.get('lists', [])]
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            vectors, centroids, lists = None, [], []
+        if vectors is None or len(vectors) != len(products):
+            return cls(products, embed=embed)
+        if len(lists) != len(centroids) or sum(len(ids) for ids in lists) != len(products):
+            centroids, lists = [], []
+        return cls(products, embed=embed, vectors=vectors, centroids=centroids, lists=lists)
@@ -1,18 +1,146 @@
 import os
 import sys
 import json
+import io
+import re
+import wave
+import tempfile
+from collections import Counter
+import glob
+import asyncio
+import time
 import logging
-from typing import Dict, Any
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
 from pathlib import Path
 import argparse
 from pydub import AudioSegment
-import openai
+from pydub.silence import detect_leading_silence, detect_silence
+from pydub.utils import mediainfo
 from dotenv import load_dotenv
+from cache import StageCache, file_sha256, text_sha256
+from sinks import open_sink
+from scheduler import RequestScheduler, is_retryable
+import instrumentation
+from instrumentation import bind_context, record, record_usage, track_run, track_stage
+
+# The schema library, the LLM output validation stage, token budgeting and the shared OpenAI client live in task_8
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'task_8'))
+from openai_client import HTTP_MAX_CONNECTIONS, HTTP_TIMEOUT, close_client, configure_client, get_client  # noqa: E402
+from schema import Schema, ValidationError  # noqa: E402
+from llm_output import ResponseValidator, repair_messages  # noqa: E402
+from token_budget import TokenUsage, count_message_tokens, count_tokens, output_budget, truncate_to_tokens  # noqa: E402
 
 
 RESULTS_DIR = Path('results')
 WHISPER_MODEL = "whisper-1"
 GPT_MODEL = "gpt-4.1-mini"
+# Bump a prompt version whenever its prompt changes, so cached outputs are not reused.
+SUMMARY_PROMPT_VERSION = 2
+TOPICS_PROMPT_VERSION = 3
+PREPROCESS_SAMPLE_RATE = 16000
+PREPROCESS_FORMAT = "mp3"
+PREPROCESS_BITRATE = "32k"
+UPLINK_MBPS = 10.0
+SUMMARY_MAX_TOKENS = 150
+SUMMARY_CHUNK_TOKENS = 3000
+SUMMARY_MAP_MAX_TOKENS = 200
+SUMMARY_CONCURRENCY = 4
+TOPIC_MODES = ('local', 'gpt', 'hybrid')
+TOPIC_MAX_NGRAM = 3
+TOPIC_CANDIDATES = 30
+TOPIC_LIMIT = 10
+TOPICS_INPUT_TOKENS = 3000
+TOPIC_ITEM_TOKENS = 20
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are aren't as at be because been before being below
+between both but by can can't could couldn't did didn't do does doesn't doing don't down during each few
+for from further get gets getting got had hadn't has hasn't have haven't having he he'd he'll he's her here
+here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its itself
+just let's me more most mustn't my myself no nor not now of off on once only or other ought our ours
+ourselves out over own really right same she she'd she'll she's should shouldn't so some such than that
+that's the their theirs them themselves then there there's these they they'd they'll they're they've this
+those through to too under until up very was wasn't we we'd we'll we're we've were weren't what what's when
+when's where where's which while who who's whom why why's will with won't would wouldn't you you'd you'll
+you're you've your yours yourself yourselves also going gonna want wanna kind sort thing things something
+anything everything one two yes yeah yep okay ok oh uh um hmm mm like know think mean well actually
+basically maybe pretty lot little much many say said says tell told go goes went come came see look
+nope sure must ago currently three four five six seven eight nine ten first last time times day days
+""".split())
+CACHE_DIR = Path('.cache')
+CACHE_MAX_MB = 500
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.m4a', '.flac', '.ogg', '.webm', '.mp4', '.mpeg', '.mpga', '.aac'}
+DEFAULT_BATCH_WORKERS = 8
+RESULT_FILES = ("transcription.md", "summary.md", "analysis.json")
+ON_EXISTS_POLICIES = ('ask', 'overwrite', 'version', 'skip')
+WHISPER_MAX_BYTES = 25 * 1024 * 1024
+CHUNK_SECONDS = 600
+CHUNK_OVERLAP_SECONDS = 2.0
+CHUNK_CONCURRENCY = 4
+CHUNK_FORMAT = "mp3"
+SILENCE_SEARCH_FRACTION = 0.2
+MIN_SILENCE_MS = 400
+MAX_OVERLAP_WORDS = 40
+DEFAULT_DECODE_WORKERS = os.cpu_count() or 2
+WHISPER_RPM = 50
+CHAT_RPM = 500
+CHAT_TPM = 200000
+API_MAX_RETRIES = 5
+FILE_RETRY_ROUNDS = 2
+TOPICS_SCHEMA = Schema.array(Schema.object({
+    "topic": Schema.string().min_length(1),
+    "mentions": Schema.number().non_negative(),
+}).allow_unknown())
+TOPIC_LABELS_SCHEMA = Schema.array(Schema.object({
+    "topic": Schema.string().min_length(1),
+    "phrases": Schema.array(Schema.string()),
+}).allow_unknown())
+
+# Per-stage concurrency limits; a stage without a semaphore is unlimited.
+_stage_semaphores: Dict[str, threading.Semaphore] = {}
+# Process pool used for audio decoding in batch mode.
+_decode_pool: Optional[ProcessPoolExecutor] = None
+# Thread pool shared by the summary map calls of all recordings; created on first use.
+_summary_pool: Optional[ThreadPoolExecutor] = None
+_summary_pool_lock = threading.Lock()
+# What to do when results already exist, and the optional single-file sink (JSONL/Parquet).
+_output: Dict[str, Any] = {'on_exists': 'ask', 'sink': None}
+# Pre-processing before upload (mono, 16 kHz, trimmed, compact codec); off by default.
+_preprocess: Dict[str, Any] = {'enabled': False, 'uplink_mbps': UPLINK_MBPS}
+# Topic extraction mode: 'local' counting only, 'gpt' only, or 'hybrid' (local counts, GPT labels).
+_topics: Dict[str, str] = {'mode': 'hybrid'}
+# Stage output cache; None disables caching (--no-cache).
+_cache: Optional[StageCache] = None
+# Shared rate-limited, retrying schedulers for the Whisper and chat APIs
+_schedulers: Dict[str, RequestScheduler] = {
+    'whisper': RequestScheduler('whisper', WHISPER_RPM, max_retries=API_MAX_RETRIES),
+    'chat': RequestScheduler('chat', CHAT_RPM, CHAT_TPM, max_retries=API_MAX_RETRIES),
+}
+# Chunked transcription settings; 'always' chunks even files under the upload limit.
+_chunking: Dict[str, Any] = {
+    'seconds': CHUNK_SECONDS,
+    'overlap': CHUNK_OVERLAP_SECONDS,
+    'concurrency': CHUNK_CONCURRENCY,
+    'always': False,
+}
+# Estimated and reported tokens of every chat call, by call name
+_token_usage = TokenUsage()
+# Compiled validators for the JSON returned by GPT; each keeps its own overhead statistics.
+_validators: Dict[str, ResponseValidator] = {
+    'topics': ResponseValidator('topics', TOPICS_SCHEMA),
+    'topic_labels': ResponseValidator('topic_labels', TOPIC_LABELS_SCHEMA),
+}
+
+
+class PipelineError(Exception):
+    """Processing a recording failed. retryable marks transient API failures (rate limits,
+    timeouts, 5xx) that are worth another attempt later in a batch."""
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
 
 
 def setup_logging() -> None:
@@ -25,12 +153,14 @@ def setup_logging() -> None:
 
 
 def load_api_key() -> None:
-    """Load environment variables and set OpenAI API key."""
+    """Load environment variables and set the OpenAI API key of the shared client."""
     load_dotenv()
-    openai.api_key = os.getenv('TOKEN')
-    if not openai.api_key:
+    api_key = os.getenv('TOKEN')
+    if not api_key:
         logging.error("OpenAI API key not found in environment variable 'TOKEN'.")
         sys.exit(1)
+    # Retries are handled by the request scheduler, so the SDK's own retries are disabled
+    configure_client(api_key=api_key, max_retries=0)
 
 
 def ensure_results_dir() -> None:
@@ -44,50 +174,406 @@ def get_audio_duration(audio_path: Path) -> float:
         audio = AudioSegment.from_file(str(audio_path))
         return audio.duration_seconds
     except Exception as e:
-        logging.error(
+        raise PipelineError(
             f"Could not read audio file '{audio_path}'. "
             "Make sure the file exists, is a supported format (mp3, wav, m4a, flac, ogg, webm, etc.), "
-            "and ffmpeg is installed. Error: {e}"
-        )
-        sys.exit(1)
+            f"and ffmpeg is installed. Error: {e}"
+        ) from e
+
+
+def configure_stage_limits(limits: Dict[str, int]) -> None:
+    """Set the maximum number of concurrent calls per stage (e.g. {'transcribe': 4})."""
+    _stage_semaphores.clear()
+    for stage, limit in limits.items():
+        if limit and limit > 0:
+            _stage_semaphores[stage] = threading.Semaphore(limit)
+
+
+def configure_scheduling(whisper_rpm: float = WHISPER_RPM, chat_rpm: float = CHAT_RPM,
+                         chat_tpm: float = CHAT_TPM, max_retries: int = API_MAX_RETRIES) -> None:
+    """Set the request/token rate limits and retry count of the shared API schedulers."""
+    _schedulers['whisper'] = RequestScheduler('whisper', whisper_rpm, max_retries=max_retries)
+    _schedulers['chat'] = RequestScheduler('chat', chat_rpm, chat_tpm, max_retries=max_retries)
+
+
+def api_call(api: str, fn: Callable[[], Any], tokens: int = 0) -> Any:
+    """Run an API request through the shared scheduler ('whisper' or 'chat'), counting retries."""
+    return _schedulers[api].call(fn, tokens, on_retry=lambda: record(retries=1))
+
+
+def api_error(message: str, error: Exception) -> PipelineError:
+    """Wrap an API error, marking it retryable if it was transient."""
+    return PipelineError(f"{message} Error: {error}", retryable=is_retryable(error))
+
+
+def stage_limit(stage: str):
+    """Return a context manager that holds a slot of the stage's concurrency limit."""
+    return _stage_semaphores.get(stage) or nullcontext()
+
+
+def probe_duration(audio_path: Path) -> Optional[float]:
+    """Return the duration from container headers (wave for WAV, ffprobe otherwise) without decoding.
+    Returns None if the metadata is missing or cannot be read."""
+    try:
+        if audio_path.suffix.lower() == '.wav':
+            with wave.open(str(audio_path), 'rb') as wav:
+                return wav.getnframes() / float(wav.getframerate())
+        duration = mediainfo(str(audio_path)).get('duration')
+        return float(duration) if duration else None
+    except Exception:
+        return None
+
+
+class RecordingAudio:
+    """The audio of one recording, decoded at most once and shared between pipeline stages.
+
+    With keep_decoded the duration is taken from the decoded buffer (which chunking or
+    pre-processing will need anyway); otherwise it is probed from the container headers
+    and the audio is only decoded if probing fails.
+    """
+
+    def __init__(self, audio_path: Path, keep_decoded: bool = False):
+        self.path = audio_path
+        self.keep_decoded = keep_decoded
+        self._segment: Optional[AudioSegment] = None
+        self._duration: Optional[float] = None
+        self._hash: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def segment(self) -> AudioSegment:
+        """Return the decoded audio, decoding it on first use."""
+        with self._lock:
+            if self._segment is None:
+                try:
+                    self._segment = AudioSegment.from_file(str(self.path))
+                    self._duration = self._segment.duration_seconds
+                except Exception as e:
+                    raise PipelineError(f"Could not decode audio file '{self.path}'. Error: {e}") from e
+            return self._segment
+
+    def duration(self) -> float:
+        """Return the duration in seconds, decoding only when needed."""
+        if self._duration is not None:
+            return self._duration
+        if self.keep_decoded:
+            return self.segment().duration_seconds
+        probed = probe_duration(self.path)
+        if probed is not None:
+            return probed
+        if _decode_pool is not None:
+            return _decode_pool.submit(get_audio_duration, self.path).result()
+        return get_audio_duration(self.path)
+
+    def content_hash(self) -> str:
+        """Return the SHA-256 of the file content, computed once."""
+        with self._lock:
+            if self._hash is None:
+                self._hash = file_sha256(self.path)
+            return self._hash
+
+    def release(self) -> None:
+        """Drop the decoded buffer once no stage needs it."""
+        with self._lock:
+            self._segment = None
+
+
+def decode_duration(recording: RecordingAudio) -> float:
+    """Get the recording duration under the decode stage limit."""
+    with stage_limit('decode'):
+        return recording.duration()
 
 
 def transcribe_audio(audio_path: Path) -> str:
     """Transcribe audio using OpenAI Whisper API. Raise a clear error if format is unsupported."""
     logging.info(f"Transcribing {audio_path} using OpenAI Whisper...")
     try:
-        with audio_path.open("rb") as audio_file:
-            transcript_response = openai.audio.transcriptions.create(
-                model=WHISPER_MODEL,
-                file=audio_file,
-                response_format="text"
-            )
-        return transcript_response
+        record(bytes_uploaded=audio_path.stat().st_size)
+        data = audio_path.read_bytes()
+        return api_call('whisper', lambda: get_client().audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=(audio_path.name, data),
+            response_format="text"
+        ))
     except Exception as e:
-        logging.error(
+        raise api_error(
             f"Could not transcribe audio file '{audio_path}'. "
-            "Make sure the file is a supported format for OpenAI Whisper. Error: {e}"
-        )
-        sys.exit(1)
+            "Make sure the file is a supported format for OpenAI Whisper.", e
+        ) from e
 
 
-def summarize_text(text: str) -> str:
-    """Summarize text using OpenAI GPT model, requesting a short summary if possible."""
-    logging.info("Summarizing transcription using OpenAI GPT (short summary)...")
+def configure_chunking(seconds: float = CHUNK_SECONDS, overlap: float = CHUNK_OVERLAP_SECONDS,
+                       concurrency: int = CHUNK_CONCURRENCY, always: bool = False) -> None:
+    """Configure chunked transcription (chunk length, overlap, parallel chunk uploads)."""
+    _chunking.update(seconds=seconds, overlap=overlap, concurrency=max(1, concurrency), always=always)
+
+
+def plan_chunks(audio: AudioSegment, max_chunk_ms: int, overlap_ms: int) -> List[Tuple[int, int]]:
+    """Return (start_ms, end_ms) chunk bounds no longer than max_chunk_ms.
+    Each cut is placed in the middle of the last silence found near the chunk end (hard cut if none),
+    and each following chunk starts overlap_ms before the previous cut.
+    Raises ValueError unless overlap_ms is shorter than the part of a chunk before the silence search window."""
+    if overlap_ms >= max_chunk_ms * (1 - SILENCE_SEARCH_FRACTION):
+        raise ValueError(f"Chunk overlap ({overlap_ms} ms) must be shorter than "
+                         f"{1 - SILENCE_SEARCH_FRACTION:.0%} of the chunk length ({max_chunk_ms} ms)")
+    total = len(audio)
+    silence_thresh = audio.dBFS - 16 if audio.dBFS != float('-inf') else -60
+    bounds = []
+    start = 0
+    while start < total:
+        end = min(start + max_chunk_ms, total)
+        if end < total:
+            window_start = end - int(max_chunk_ms * SILENCE_SEARCH_FRACTION)
+            silences = detect_silence(audio[window_start:end], min_silence_len=MIN_SILENCE_MS, silence_thresh=silence_thresh)
+            if silences:
+                silence_start, silence_end = silences[-1]
+                end = window_start + (silence_start + silence_end) // 2
+        if bounds and end <= bounds[-1][1]:
+            break  # nothing after the previous cut; the chunk would only repeat its overlap
+        bounds.append((start, end))
+        if end >= total:
+            break
+        start = end - overlap_ms
+    return bounds
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", '', word.lower())
+
+
+def merge_overlap(previous: str, following: str, max_words: int = MAX_OVERLAP_WORDS) -> str:
+    """Append following to previous, dropping the leading words of following that repeat
+    the end of previous (the audio overlap transcribed twice)."""
+    prev_words = previous.split()
+    next_words = following.split()
+    prev_norm = [_normalize_word(w) for w in prev_words[-max_words:]]
+    next_norm = [_normalize_word(w) for w in next_words[:max_words]]
+    for size in range(min(len(prev_norm), len(next_norm)), 0, -1):
+        if prev_norm[-size:] == next_norm[:size]:
+            next_words = next_words[size:]
+            break
+    return ' '.join(prev_words + next_words)
+
+
+def transcribe_chunk(audio: AudioSegment, bounds: Tuple[int, int], index: int) -> str:
+    """Encode one chunk in memory and transcribe it with Whisper."""
+    buffer = io.BytesIO()
+    audio[bounds[0]:bounds[1]].export(buffer, format=CHUNK_FORMAT)
+    record(bytes_uploaded=buffer.tell())
+    response = api_call('whisper', lambda: get_client().audio.transcriptions.create(
+        model=WHISPER_MODEL,
+        file=(f"chunk_{index:04d}.{CHUNK_FORMAT}", buffer.getvalue()),
+        response_format="text"
+    ))
+    return response.strip()
+
+
+def transcribe_audio_chunked(audio_path: Path, audio: Optional[AudioSegment] = None) -> str:
+    """Split the recording on silence, transcribe the chunks concurrently and stitch them in order."""
     try:
-        response = openai.chat.completions.create(
-            model=GPT_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes meeting transcripts."},
-                {"role": "user", "content": f"Summarize the following transcript as briefly as possible, focusing only on the most important points:\n{text}"}
-            ],
-            max_tokens=150,
-            temperature=0
-        )
+        if audio is None:
+            audio = AudioSegment.from_file(str(audio_path))
+        bounds = plan_chunks(audio, int(_chunking['seconds'] * 1000), int(_chunking['overlap'] * 1000))
+        logging.info(f"Transcribing {audio_path} in {len(bounds)} chunks "
+                     f"({_chunking['concurrency']} concurrent) using OpenAI Whisper...")
+        with ThreadPoolExecutor(max_workers=_chunking['concurrency']) as pool:
+            texts = list(pool.map(bind_context(lambda item: transcribe_chunk(audio, item[1], item[0])), enumerate(bounds)))
+    except PipelineError:
+        raise
+    except Exception as e:
+        raise api_error(f"Could not transcribe audio file '{audio_path}' in chunks.", e) from e
+    transcript = ''
+    for text in texts:
+        transcript = merge_overlap(transcript, text) if transcript else text
+    return transcript
+
+
+def configure_preprocessing(enabled: bool = False, uplink_mbps: float = UPLINK_MBPS) -> None:
+    """Enable the pre-processing stage; uplink_mbps is used to estimate the upload time saved."""
+    _preprocess.update(enabled=enabled, uplink_mbps=uplink_mbps)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating a single-file one outside batch mode."""
+    global _decode_pool
+    if _decode_pool is None:
+        _decode_pool = ProcessPoolExecutor(max_workers=DEFAULT_DECODE_WORKERS)
+    return _decode_pool
+
+
+def preprocess_audio(audio_path: Path) -> Dict[str, Any]:
+    """Downmix to mono, resample to 16 kHz, trim leading/trailing silence and encode compactly.
+    Runs in a worker process and returns the encoded bytes with size and time figures."""
+    start = time.perf_counter()
+    audio = AudioSegment.from_file(str(audio_path))
+    original_ms = len(audio)
+    audio = audio.set_channels(1).set_frame_rate(PREPROCESS_SAMPLE_RATE)
+    silence_thresh = audio.dBFS - 16 if audio.dBFS != float('-inf') else -60
+    lead = detect_leading_silence(audio, silence_threshold=silence_thresh)
+    trail = detect_leading_silence(audio.reverse(), silence_threshold=silence_thresh)
+    if lead + trail < len(audio):
+        audio = audio[lead:len(audio) - trail]
+    buffer = io.BytesIO()
+    audio.export(buffer, format=PREPROCESS_FORMAT, bitrate=PREPROCESS_BITRATE)
+    return {
+        "data": buffer.getvalue(),
+        "format": PREPROCESS_FORMAT,
+        "original_bytes": audio_path.stat().st_size,
+        "trimmed_sec": round((original_ms - len(audio)) / 1000, 2),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def preprocess_recording(recording: RecordingAudio) -> Dict[str, Any]:
+    """Pre-process a recording in the process pool and log the byte and time savings."""
+    try:
+        prepared = get_process_pool().submit(preprocess_audio, recording.path).result()
+    except Exception as e:
+        raise PipelineError(f"Could not pre-process audio file '{recording.path}'. Error: {e}") from e
+    original, size = prepared['original_bytes'], len(prepared['data'])
+    bytes_per_sec = _preprocess['uplink_mbps'] * 1_000_000 / 8
+    upload_saved = (original - size) / bytes_per_sec
+    saved_pct = 100 * (1 - size / original) if original else 0
+    logging.info(
+        f"{recording.path.name}: pre-processed {original / 1e6:.2f} MB -> {size / 1e6:.2f} MB "
+        f"({saved_pct:.0f}% smaller, {prepared['trimmed_sec']}s silence trimmed) in {prepared['seconds']:.2f}s; "
+        f"~{upload_saved:.1f}s less upload at {_preprocess['uplink_mbps']:g} Mbps"
+    )
+    return prepared
+
+
+def needs_chunking(audio_path: Path) -> bool:
+    """Return True if the file exceeds the upload limit or chunking is forced."""
+    return _chunking['always'] or audio_path.stat().st_size > WHISPER_MAX_BYTES
+
+
+def transcribe_prepared(recording: RecordingAudio, prepared: Dict[str, Any]) -> str:
+    """Transcribe pre-processed audio bytes, chunking them if still over the upload limit."""
+    data, fmt = prepared['data'], prepared['format']
+    if _chunking['always'] or len(data) > WHISPER_MAX_BYTES:
+        return transcribe_audio_chunked(recording.path, AudioSegment.from_file(io.BytesIO(data), format=fmt))
+    logging.info(f"Transcribing pre-processed {recording.path} using OpenAI Whisper...")
+    try:
+        record(bytes_uploaded=len(data))
+        return api_call('whisper', lambda: get_client().audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=(f"{recording.path.stem}.{fmt}", data),
+            response_format="text"
+        ))
+    except Exception as e:
+        raise api_error(f"Could not transcribe pre-processed audio file '{recording.path}'.", e) from e
+
+
+def transcribe_recording(recording: RecordingAudio) -> str:
+    """Transcribe in one request, or in chunks from the shared decoded buffer when needed.
+    With pre-processing enabled, the compact pre-processed audio is uploaded instead."""
+    if _preprocess['enabled']:
+        prepared = preprocess_recording(recording)
+        if len(prepared['data']) < prepared['original_bytes']:
+            return transcribe_prepared(recording, prepared)
+        logging.info(f"{recording.path.name}: pre-processing did not shrink the file, uploading the original")
+    if needs_chunking(recording.path):
+        return transcribe_audio_chunked(recording.path, recording.segment())
+    return transcribe_audio(recording.path)
+
+
+def split_by_tokens(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens (estimated), breaking between sentences
+    where possible and between words for overlong sentences."""
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+        tokens = count_tokens(sentence) + 1
+        if current and used + tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current, used = [], 0
+        while tokens > max_tokens:
+            head = truncate_to_tokens(sentence, max_tokens) or sentence.split()[0]
+            chunks.append(head)
+            sentence = sentence[len(head):].strip()
+            tokens = count_tokens(sentence) + 1
+        if sentence:
+            current.append(sentence)
+            used += tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def chat_completion(call: str, messages: List[Dict[str, str]], max_tokens: int) -> Any:
+    """Run one rate-limited chat completion. The prompt is counted locally, max_tokens is
+    limited to the room left in the context window, and the tokens are recorded under call."""
+    prompt_tokens = count_message_tokens(messages)
+    max_tokens = output_budget(prompt_tokens, max_tokens)
+    response = api_call('chat', lambda: get_client().chat.completions.create(
+        model=GPT_MODEL,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=0
+    ), tokens=prompt_tokens + max_tokens)
+    record_usage(response)
+    _token_usage.record(call, prompt_tokens, max_tokens, response)
+    return response
+
+
+def chat_summary(instruction: str, text: str, max_tokens: int) -> str:
+    """Run one summarization request."""
+    try:
+        response = chat_completion('summary', [
+            {"role": "system", "content": "You are a helpful assistant that summarizes meeting transcripts."},
+            {"role": "user", "content": f"{instruction}\n{text}"}
+        ], max_tokens)
         return response.choices[0].message.content.strip()
     except Exception as e:
-        logging.error(f"Error during summarization: {e}")
-        sys.exit(1)
+        raise api_error("Error during summarization.", e) from e
+
+
+def get_summary_pool() -> ThreadPoolExecutor:
+    """Return the executor for summary map calls. It is shared, so a batch runs at most
+    SUMMARY_CONCURRENCY map calls at once in total rather than that many per recording."""
+    global _summary_pool
+    with _summary_pool_lock:
+        if _summary_pool is None:
+            _summary_pool = ThreadPoolExecutor(max_workers=SUMMARY_CONCURRENCY, thread_name_prefix='summary-map')
+        return _summary_pool
+
+
+def summarize_map_reduce(text: str) -> str:
+    """Summarize a long transcript hierarchically.
+    Map: token-bounded chunks are summarized concurrently (SUMMARY_MAP_MAX_TOKENS each).
+    Reduce: the partial summaries are combined in a final call (SUMMARY_MAX_TOKENS); if they
+    do not fit in one chunk, they are mapped again first, one level at a time."""
+    level = 0
+    parts = split_by_tokens(text, SUMMARY_CHUNK_TOKENS)
+    while len(parts) > 1:
+        level += 1
+        start = time.perf_counter()
+        instruction = ("Summarize this part of a longer meeting transcript, keeping the key points, decisions and names:"
+                       if level == 1 else
+                       "Condense these partial summaries of a meeting into one summary, keeping the key points:")
+        partials = list(get_summary_pool().map(bind_context(lambda part: chat_summary(instruction, part, SUMMARY_MAP_MAX_TOKENS)), parts))
+        logging.info(f"Summary map level {level}: {len(parts)} chunks in {time.perf_counter() - start:.2f}s")
+        parts = split_by_tokens('\n'.join(partials), SUMMARY_CHUNK_TOKENS)
+    start = time.perf_counter()
+    summary = chat_summary(
+        "Combine these partial summaries of one meeting into a single summary, as brief as possible, focusing only on the most important points:",
+        parts[0] if parts else '', SUMMARY_MAX_TOKENS
+    )
+    logging.info(f"Summary reduce: {time.perf_counter() - start:.2f}s")
+    return summary
+
+
+def summarize_text(text: str) -> str:
+    """Summarize text using OpenAI GPT model, requesting a short summary if possible.
+    Transcripts longer than SUMMARY_CHUNK_TOKENS are summarized with map-reduce."""
+    if count_tokens(text) > SUMMARY_CHUNK_TOKENS:
+        logging.info("Summarizing long transcription using OpenAI GPT (map-reduce)...")
+        return summarize_map_reduce(text)
+    logging.info("Summarizing transcription using OpenAI GPT (short summary)...")
+    return chat_summary(
+        "Summarize the following transcript as briefly as possible, focusing only on the most important points:",
+        text, SUMMARY_MAX_TOKENS
+    )
 
 
 def get_word_count(transcript: str) -> int:
@@ -100,6 +586,26 @@ def get_speaking_speed_wpm(word_count: int, duration_sec: float) -> float:
     return word_count / (duration_sec / 60) if duration_sec > 0 else 0
 
 
+def chat_json(validator: str, messages: List[Dict[str, str]], max_tokens: int, expected: str) -> Any:
+    """Call the chat API and validate its JSON answer with the named response validator.
+    An invalid answer gets one repair call that quotes the exact validation error;
+    raises ValidationError if the repaired answer is still invalid."""
+    def complete(chat_messages: List[Dict[str, str]]) -> str:
+        response = chat_completion(validator, chat_messages, max_tokens)
+        return response.choices[0].message.content or ""
+
+    def repair(content: str, error: str) -> str:
+        logging.warning(f"Invalid {validator} response ({error}), asking GPT to repair it")
+        return complete(repair_messages(messages, content, error, expected))
+
+    return _validators[validator].parse_with_repair(complete(messages), repair)
+
+
+def validation_stats() -> List[Dict[str, Any]]:
+    """Counts and mean parse/validation time of the response validators that were used."""
+    return [stats for stats in (v.stats() for v in _validators.values()) if stats['responses']]
+
+
 def gpt_topics(transcript: str) -> list:
     """Use GPT to extract a list of frequently mentioned topics from the transcript."""
     logging.info("Extracting topics using GPT (deterministic)...")
@@ -108,98 +614,422 @@ def gpt_topics(transcript: str) -> list:
             "Given the following transcript, extract a list of the most frequently mentioned topics. "
             "Return the result as a JSON list of objects with 'topic' and 'mentions'. "
             "For topic labeling, group related phrases under a single, clear label, and count all relevant mentions. "
-            "Return only the JSON list.\n\n"
-            f"Transcript:\n{transcript[:2000]}\n\n"
-        )
-        response = openai.chat.completions.create(
-            model=GPT_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an expert at extracting topics from meeting transcripts."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0
+            f"Return at most {TOPIC_LIMIT} topics and only the JSON list.\n\n"
+            f"Transcript:\n{truncate_to_tokens(transcript, TOPICS_INPUT_TOKENS)}\n\n"
         )
-        content = response.choices[0].message.content.strip()
-        start = content.find('[')
-        end = content.rfind(']') + 1
-        topics = json.loads(content[start:end])
-        return topics
+        return chat_json('topics', [
+            {"role": "system", "content": "You are an expert at extracting topics from meeting transcripts."},
+            {"role": "user", "content": prompt}
+        ], TOPIC_LIMIT * TOPIC_ITEM_TOKENS, "a list of objects with 'topic' (string) and 'mentions' (number)")
+    except ValidationError as e:
+        logging.error(f"GPT topic extraction returned invalid JSON after a repair attempt: {e.message}")
+        return []
     except Exception as e:
         logging.error(f"Error during GPT topic extraction: {e}")
         return []
 
 
-def analytics(transcript: str, duration_sec: float) -> dict:
-    """Hybrid analytics: word count and WPM in Python, topics by GPT."""
-    word_count = get_word_count(transcript)
-    wpm = get_speaking_speed_wpm(word_count, duration_sec)
-    topics = gpt_topics(transcript)
+def configure_topics(mode: str = 'hybrid') -> None:
+    """Select how topics are extracted: 'local', 'gpt' or 'hybrid'."""
+    _topics['mode'] = mode
+
+
+def local_topic_candidates(transcript: str, limit: int = TOPIC_CANDIDATES) -> List[Dict[str, Any]]:
+    """Count keyphrases over the full transcript without any API call.
+    Candidates are 1-3 word n-grams that neither start nor end with a stopword, counted in
+    one linear pass. Phrases are scored by mentions weighted by length, and a shorter phrase
+    is dropped when a longer phrase containing it accounts for most of its mentions.
+    Returns [{'topic', 'mentions'}] sorted by score."""
+    words = re.findall(r"[a-z][a-z'-]*", transcript.lower())
+    counts: Counter = Counter()
+    for i in range(len(words)):
+        for n in range(1, TOPIC_MAX_NGRAM + 1):
+            gram = words[i:i + n]
+            if len(gram) < n or gram[0] in STOPWORDS or gram[-1] in STOPWORDS:
+                continue
+            if n == 1 and len(gram[0]) < 3:
+                continue
+            counts[' '.join(gram)] += 1
+    phrases = [(phrase, count) for phrase, count in counts.items() if count >= 2]
+    phrases.sort(key=lambda item: (-item[1] * (1 + 0.5 * (len(item[0].split()) - 1)), item[0]))
+    selected: List[Tuple[str, int]] = []
+    for phrase, count in phrases:
+        if any(f" {phrase} " in f" {longer} " and longer_count >= 0.7 * count for longer, longer_count in selected):
+            continue
+        selected.append((phrase, count))
+        if len(selected) >= limit:
+            break
+    return [{"topic": phrase, "mentions": count} for phrase, count in selected]
+
+
+def group_mentions(counts: Dict[str, int]) -> int:
+    """Count the mentions of a group of phrases without counting nested phrases twice.
+    Every occurrence of "chest pain" is also one of "chest" and of "pain", so each phrase
+    only adds the occurrences not covered by its smallest containing phrases in the group."""
+    padded = {phrase: f" {phrase} " for phrase in counts}
+    total = 0
+    for phrase, count in counts.items():
+        containers = [longer for longer in counts if longer != phrase and padded[phrase] in padded[longer]]
+        smallest = [c for c in containers if not any(other != c and padded[other] in padded[c] for other in containers)]
+        total += max(0, count - sum(counts[c] for c in smallest))
+    return total
+
+
+def label_topics_with_gpt(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ask GPT only to group and label the locally counted phrases; mentions are summed locally.
+    Falls back to the unlabeled candidates if the call fails."""
+    logging.info("Labeling locally extracted topics using GPT...")
+    counts = {c['topic']: c['mentions'] for c in candidates}
+    try:
+        prompt = (
+            "Group the following phrases from a transcript into a few clear topics. "
+            "Return only a JSON list of objects with 'topic' (a short, clear label) and 'phrases' (the phrases from the list that belong to it). "
+            "Use every phrase at most once and leave out phrases that are not meaningful topics.\n\n"
+            + "\n".join(f"- {phrase} ({count})" for phrase, count in counts.items())
+        )
+        # The answer repeats each phrase at most once, plus a label per topic
+        label_tokens = sum(count_tokens(json.dumps(phrase)) + 1 for phrase in counts) + TOPIC_LIMIT * TOPIC_ITEM_TOKENS
+        groups = chat_json('topic_labels', [
+            {"role": "system", "content": "You are an expert at labeling topics from meeting transcripts."},
+            {"role": "user", "content": prompt}
+        ], label_tokens, "a list of objects with 'topic' (string) and 'phrases' (list of strings)")
+        topics = []
+        for group in groups:
+            mentions = group_mentions({phrase: counts[phrase] for phrase in group['phrases'] if phrase in counts})
+            if mentions:
+                topics.append({"topic": group['topic'], "mentions": mentions})
+        return sorted(topics, key=lambda t: -t['mentions']) or candidates[:TOPIC_LIMIT]
+    except ValidationError as e:
+        logging.error(f"GPT topic labeling returned invalid JSON after a repair attempt: {e.message}")
+        return candidates[:TOPIC_LIMIT]
+    except Exception as e:
+        logging.error(f"Error during GPT topic labeling: {e}")
+        return candidates[:TOPIC_LIMIT]
+
+
+def extract_topics(transcript: str) -> List[Dict[str, Any]]:
+    """Extract frequently mentioned topics using the configured mode."""
+    mode = _topics['mode']
+    if mode == 'gpt':
+        return gpt_topics(transcript)
+    candidates = local_topic_candidates(transcript)
+    if mode == 'local' or not candidates:
+        return candidates[:TOPIC_LIMIT]
+    return label_topics_with_gpt(candidates)
+
+
+# A stage graph maps stage name -> (dependency names, function of the dependency results).
+StageGraph = Dict[str, Tuple[Sequence[str], Callable[..., Any]]]
+
+
+async def run_stage_graph(graph: StageGraph) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Run each stage as soon as its dependencies finish; independent stages run concurrently.
+    Blocking stage functions run in the default thread pool, each tracked as an instrumentation
+    stage of the current run. Returns (results, wall seconds per stage)."""
+    loop = asyncio.get_running_loop()
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Future] = {}
+
+    async def run(name: str) -> None:
+        deps, fn = graph[name]
+        await asyncio.gather(*(tasks[dep] for dep in deps))
+        args = [results[dep] for dep in deps]
+        start = time.perf_counter()
+        def call() -> Any:
+            with track_stage(name):
+                return fn(*args)
+        results[name] = await loop.run_in_executor(None, bind_context(call))
+        timings[name] = round(time.perf_counter() - start, 3)
+
+    for name in graph:
+        tasks[name] = asyncio.ensure_future(run(name))
+    await asyncio.gather(*tasks.values())
+    return results, timings
+
+
+def configure_cache(enabled: bool = True, cache_dir: Path = CACHE_DIR, max_mb: float = CACHE_MAX_MB) -> None:
+    """Enable the stage output cache in cache_dir with a size limit, or disable it."""
+    global _cache
+    _cache = StageCache(cache_dir, int(max_mb * 1024 * 1024)) if enabled else None
+
+
+def stage_cache_parts(stage: str) -> Tuple[Any, ...]:
+    """Return the model, prompt version and settings parts of a stage's cache key."""
     return {
-        "word_count": word_count,
-        "speaking_speed_wpm": int(wpm),
-        "frequently_mentioned_topics": topics
+        'transcribe': (WHISPER_MODEL, _preprocess['enabled'] and (PREPROCESS_SAMPLE_RATE, PREPROCESS_FORMAT, PREPROCESS_BITRATE),
+                       _chunking['always'], _chunking['seconds'], _chunking['overlap']),
+        'summarize': (GPT_MODEL, SUMMARY_PROMPT_VERSION, SUMMARY_MAX_TOKENS, SUMMARY_CHUNK_TOKENS, SUMMARY_MAP_MAX_TOKENS),
+        'topics': (GPT_MODEL, TOPICS_PROMPT_VERSION, _topics['mode'], TOPIC_CANDIDATES, TOPIC_LIMIT, TOPICS_INPUT_TOKENS),
+    }[stage]
+
+
+def cached(stage: str, recording: "RecordingAudio", fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a stage function so its output is looked up in and stored to the stage cache.
+    Transcription is keyed on the audio content; the stages after it on the transcript they
+    consume, so a new transcript (other chunking or pre-processing) never reuses old outputs.
+    Empty outputs (e.g. topics after an API error) are not cached."""
+    def wrapper(*args: Any) -> Any:
+        if _cache is None:
+            return fn(*args)
+        source = recording.content_hash() if stage == 'transcribe' else text_sha256(args[0])
+        key = StageCache.make_key(source, stage, *stage_cache_parts(stage))
+        value = _cache.get(stage, key)
+        if value is not None:
+            logging.info(f"{recording.path.name}: using cached {stage} output")
+            return value
+        value = fn(*args)
+        if value:
+            _cache.put(stage, key, value)
+        return value
+    return wrapper
+
+
+def limited(stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a stage function so it runs under the stage's concurrency limit."""
+    def wrapper(*args: Any) -> Any:
+        with stage_limit(stage):
+            return fn(*args)
+    return wrapper
+
+
+def build_pipeline_graph(recording: RecordingAudio) -> StageGraph:
+    """Return the processing graph for one recording.
+    Decoding and transcription are independent; summary, topics and the word count/WPM
+    metrics all depend only on the transcript (metrics also on the duration)."""
+    def transcribe() -> str:
+        transcript = transcribe_recording(recording)
+        recording.release()
+        return transcript
+
+    def metrics(duration_sec: float, transcript: str) -> Dict[str, int]:
+        word_count = get_word_count(transcript)
+        return {"word_count": word_count, "speaking_speed_wpm": int(get_speaking_speed_wpm(word_count, duration_sec))}
+
+    return {
+        'decode': ((), lambda: decode_duration(recording)),
+        'transcribe': ((), cached('transcribe', recording, limited('transcribe', transcribe))),
+        'summarize': (('transcribe',), cached('summarize', recording, limited('summarize', summarize_text))),
+        'topics': (('transcribe',), cached('topics', recording, limited('topics', extract_topics))),
+        'metrics': (('decode', 'transcribe'), metrics),
     }
 
 
-def get_result_subdir(audio_path: Path) -> Path:
-    """Return the subdirectory in results named after the audio file (without extension).
-    If it exists, ask user to overwrite or create a new folder with a numeric postfix."""
+def configure_output(on_exists: str = 'ask', sink_path: Optional[Path] = None) -> None:
+    """Set the policy for existing results and optionally route all results to one JSONL/Parquet file."""
+    close_output()
+    _output.update(on_exists=on_exists, sink=open_sink(sink_path) if sink_path else None)
+
+
+def close_output() -> None:
+    """Close the sink (Parquet sinks are written at this point)."""
+    if _output['sink'] is not None:
+        _output['sink'].close()
+        _output['sink'] = None
+
+
+def results_complete(subdir: Path) -> bool:
+    """Return True if all result files exist in the subdirectory."""
+    return all((subdir / name).is_file() for name in RESULT_FILES)
+
+
+def get_result_subdir(audio_path: Path, policy: str = 'ask', name: Optional[str] = None) -> Path:
+    """Return the subdirectory in results named `name` (default: the audio file name without extension).
+    If it exists, the policy decides: 'ask' the user, 'overwrite' it, or create a new
+    'version' folder with a numeric postfix ('skip' overwrites an incomplete folder)."""
     ensure_results_dir()
-    base_name = audio_path.stem
+    base_name = name or audio_path.stem
     subdir = RESULTS_DIR / base_name
     if subdir.exists():
-        postfix = 2
-        while (RESULTS_DIR / f"{base_name}_{postfix}").exists():
-            postfix += 1
-        print(f"Results for '{base_name}' already exist in: {subdir}")
-        choice = input(f"Do you want to overwrite (o) or save as new (n)? [o/n]: ").strip().lower()
-        if choice == 'n':
-            subdir = RESULTS_DIR / f"{base_name}_{postfix}"
+        choice = policy
+        if policy == 'ask':
+            print(f"Results for '{base_name}' already exist in: {subdir}")
+            answer = input(f"Do you want to overwrite (o) or save as new (n)? [o/n]: ").strip().lower()
+            choice = 'version' if answer == 'n' else 'overwrite'
+        if choice == 'version':
+            postfix = 2
+            while True:
+                subdir = RESULTS_DIR / f"{base_name}_{postfix}"
+                try:
+                    subdir.mkdir()
+                    return subdir
+                except FileExistsError:
+                    postfix += 1
     subdir.mkdir(exist_ok=True)
     return subdir
 
 
-def save_transcription(transcript: str, subdir: Path) -> Path:
-    path = subdir / "transcription.md"
-    with path.open('w') as f:
-        f.write(transcript.strip() + "\n")
+def atomic_write(path: Path, text: str) -> Path:
+    """Write text to a temporary file in the same directory, then rename it over path."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
     return path
 
 
+def save_transcription(transcript: str, subdir: Path) -> Path:
+    return atomic_write(subdir / "transcription.md", transcript.strip() + "\n")
+
+
 def save_summary(summary: str, subdir: Path) -> Path:
-    path = subdir / "summary.md"
-    with path.open('w') as f:
-        f.write(summary.strip() + "\n")
-    return path
+    return atomic_write(subdir / "summary.md", summary.strip() + "\n")
 
 
 def save_analysis(analytics: Dict[str, Any], subdir: Path) -> Path:
-    path = subdir / "analysis.json"
-    with path.open('w') as f:
-        json.dump(analytics, f, indent=2)
-    return path
+    return atomic_write(subdir / "analysis.json", json.dumps(analytics, indent=2))
 
 
-def process_audio_file(audio_path: str) -> None:
-    """Process the audio file: transcribe, summarize, analyze, and save results."""
+def process_audio_file(audio_path: str, interactive: bool = True, name: Optional[str] = None) -> Path:
+    """Process the audio file: transcribe, summarize, analyze, and save results.
+    Results are stored under `name` (default: the file name without extension).
+    Returns the results subdirectory (or the sink file). In non-interactive (batch) mode
+    nothing is printed and the 'ask' policy falls back to 'version'."""
     audio_path = Path(audio_path)
+    name = name or audio_path.stem
     if not audio_path.is_file():
-        logging.error(f"File not found: {audio_path}")
-        sys.exit(1)
-    duration_sec = get_audio_duration(audio_path)
-    transcript = transcribe_audio(audio_path)
-    summary = summarize_text(transcript)
-    analytics_result = analytics(transcript, duration_sec)
-    subdir = get_result_subdir(audio_path)
-    transcript_path = save_transcription(transcript, subdir)
-    summary_path = save_summary(summary, subdir)
-    analysis_path = save_analysis(analytics_result, subdir)
+        raise PipelineError(f"File not found: {audio_path}")
+    policy = _output['on_exists']
+    if policy == 'ask' and not interactive:
+        policy = 'version'
+    sink = _output['sink']
+    if policy == 'skip':
+        if sink is not None and sink.contains(name):
+            logging.info(f"{audio_path.name}: already in {sink.path}, skipping")
+            return sink.path
+        if sink is None and results_complete(RESULTS_DIR / name):
+            logging.info(f"{audio_path.name}: results already complete, skipping")
+            return RESULTS_DIR / name
+    start = time.perf_counter()
+    with track_run(audio_path.name) as run:
+        recording = RecordingAudio(audio_path, keep_decoded=needs_chunking(audio_path) and not _preprocess['enabled'])
+        results, timings = asyncio.run(run_stage_graph(build_pipeline_graph(recording)))
+        transcript = results['transcribe']
+        summary = results['summarize']
+        analytics_result = {
+            **results['metrics'],
+            "frequently_mentioned_topics": results['topics'],
+        }
+        stage_times = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in timings.items())
+        logging.info(f"{audio_path.name}: {stage_times}, total={time.perf_counter() - start:.2f}s")
+        with track_stage('save'):
+            # The timings include 'save' up to this point: the analysis is written last
+            if sink is not None:
+                analytics_result["timings"] = run.to_dict()
+                sink.write({
+                    "recording": name,
+                    "source": str(audio_path),
+                    "transcript": transcript.strip(),
+                    "summary": summary.strip(),
+                    "analysis": analytics_result,
+                })
+            else:
+                subdir = get_result_subdir(audio_path, policy, name)
+                transcript_path = save_transcription(transcript, subdir)
+                summary_path = save_summary(summary, subdir)
+                analytics_result["timings"] = run.to_dict()
+                analysis_path = save_analysis(analytics_result, subdir)
+        instrumentation.emit(run)
+    if sink is not None:
+        if interactive:
+            print(f"\nResults appended to: {sink.path}")
+        return sink.path
+    if not interactive:
+        return subdir
     print(f"\nTranscription saved to: {transcript_path}")
     print(f"Summary saved to: {summary_path}")
     print(f"Analysis saved to: {analysis_path}")
     print("\nSummary:\n", summary)
     print("\nAnalytics:\n", json.dumps(analytics_result, indent=2))
+    return subdir
+
+
+def collect_audio_files(pattern: str) -> List[Path]:
+    """Return the audio files in a directory, or the files matching a glob pattern, sorted."""
+    path = Path(pattern)
+    if path.is_dir():
+        candidates = path.iterdir()
+    else:
+        candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def result_names(files: Sequence[Path]) -> Dict[Path, str]:
+    """Name each file's results after its path relative to the files' common folder, with
+    sub folders joined by '__' (e.g. 'site_a__call'), so recordings with the same file name
+    in different folders do not share results. The extension is kept only where two files
+    would still get the same name ('call.mp3', 'call.wav')."""
+    resolved = {path: path.resolve() for path in files}
+    root = Path(os.path.commonpath([str(p.parent) for p in resolved.values()]))
+    names = {path: '__'.join(p.relative_to(root).with_suffix('').parts) for path, p in resolved.items()}
+    counts = Counter(names.values())
+    return {path: name if counts[name] == 1 else name + path.suffix for path, name in names.items()}
+
+
+def process_batch(pattern: str, workers: int = DEFAULT_BATCH_WORKERS, decode_workers: int = DEFAULT_DECODE_WORKERS,
+                  retry_rounds: int = FILE_RETRY_ROUNDS) -> Dict[str, Any]:
+    """Process every recording matching the pattern through a bounded worker pool.
+    Decoding runs in a process pool; API stages are limited by configure_stage_limits.
+    A failing file is logged and counted, the rest of the batch continues. Files that
+    failed on a transient API error are queued and retried for up to retry_rounds
+    further passes (stages that already succeeded are served from the cache)."""
+    global _decode_pool
+    files = collect_audio_files(pattern)
+    if not files:
+        logging.error(f"No audio files found for: {pattern}")
+        sys.exit(1)
+    names = result_names(files)
+    logging.info(f"Processing {len(files)} files with {workers} workers...")
+    start = time.perf_counter()
+    succeeded: List[str] = []
+    failed: Dict[str, str] = {}
+    retried = 0
+    pending = files
+    _decode_pool = ProcessPoolExecutor(max_workers=decode_workers)
+    try:
+        for attempt in range(retry_rounds + 1):
+            if attempt:
+                logging.info(f"Retry round {attempt}/{retry_rounds}: {len(pending)} files")
+                retried += len(pending)
+            retry: List[Path] = []
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(process_audio_file, str(path), False, names[path]): path for path in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    path = futures[future]
+                    try:
+                        subdir = future.result()
+                        succeeded.append(str(path))
+                        failed.pop(str(path), None)
+                        status = f"saved to {subdir}"
+                    except Exception as e:
+                        failed[str(path)] = repr(e)
+                        status = f"FAILED ({e!r})"
+                        if getattr(e, 'retryable', False) and attempt < retry_rounds:
+                            retry.append(path)
+                            status += ", queued for retry"
+                    elapsed = time.perf_counter() - start
+                    logging.info(f"[{done}/{len(pending)}] {path.name}: {status} ({elapsed:.1f}s elapsed)")
+            if not retry:
+                break
+            pending = retry
+    finally:
+        _decode_pool.shutdown()
+        _decode_pool = None
+    elapsed = time.perf_counter() - start
+    summary = {
+        "files": len(files),
+        "succeeded": len(succeeded),
+        "failed": failed,
+        "retried": retried,
+        "elapsed_sec": round(elapsed, 2),
+        "files_per_minute": round(len(succeeded) / (elapsed / 60), 2) if elapsed > 0 else 0,
+    }
+    print("\nBatch summary:\n", json.dumps(summary, indent=2))
+    return summary
 
 
 def main():
@@ -207,9 +1037,70 @@ def main():
     load_api_key()
     parser = argparse.ArgumentParser(description="Transcribe, summarize, and analyze an audio file.")
     parser.add_argument('audio_path', nargs='?', help='Path to the audio file')
+    parser.add_argument('--batch', metavar='DIR_OR_GLOB', help='Process every audio file in a directory or matching a glob')
+    parser.add_argument('--workers', type=int, default=DEFAULT_BATCH_WORKERS, help='Files processed concurrently in batch mode')
+    parser.add_argument('--decode-workers', type=int, default=DEFAULT_DECODE_WORKERS, help='Processes used for audio decoding in batch mode')
+    parser.add_argument('--decode-limit', type=int, default=0, help='Max concurrent decodes (0 = unlimited)')
+    parser.add_argument('--transcribe-limit', type=int, default=4, help='Max concurrent Whisper calls (0 = unlimited)')
+    parser.add_argument('--summarize-limit', type=int, default=8, help='Max concurrent summary calls (0 = unlimited)')
+    parser.add_argument('--topics-limit', type=int, default=8, help='Max concurrent topic calls (0 = unlimited)')
+    parser.add_argument('--chunk', action='store_true', help='Always transcribe in chunks (files over 25 MB are always chunked)')
+    parser.add_argument('--chunk-seconds', type=float, default=CHUNK_SECONDS, help='Maximum chunk length in seconds')
+    parser.add_argument('--chunk-overlap', type=float, default=CHUNK_OVERLAP_SECONDS, help='Overlap between chunks in seconds')
+    parser.add_argument('--chunk-concurrency', type=int, default=CHUNK_CONCURRENCY, help='Chunks transcribed concurrently per file')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the stage output cache')
+    parser.add_argument('--cache-dir', type=Path, default=CACHE_DIR, help='Directory of the stage output cache')
+    parser.add_argument('--cache-max-mb', type=float, default=CACHE_MAX_MB, help='Cache size limit in MB (least recently used entries are evicted)')
+    parser.add_argument('--preprocess', action='store_true', help='Downmix, resample to 16 kHz, trim silence and compress before upload')
+    parser.add_argument('--uplink-mbps', type=float, default=UPLINK_MBPS, help='Uplink speed used to estimate upload time saved by pre-processing')
+    parser.add_argument('--on-exists', choices=ON_EXISTS_POLICIES, default=None,
+                        help="When results exist: ask (default for one file), overwrite, version (default for batches), or skip if complete")
+    parser.add_argument('--sink', type=Path, help='Write all results to one .jsonl file or .parquet dataset directory instead of per-file folders')
+    parser.add_argument('--topics', choices=TOPIC_MODES, default='hybrid',
+                        help='Topic extraction: local counting, gpt only, or hybrid (local counts labeled by GPT)')
+    parser.add_argument('--whisper-rpm', type=float, default=WHISPER_RPM, help='Whisper requests per minute')
+    parser.add_argument('--chat-rpm', type=float, default=CHAT_RPM, help='Chat completion requests per minute')
+    parser.add_argument('--chat-tpm', type=float, default=CHAT_TPM, help='Chat completion tokens per minute (estimated)')
+    parser.add_argument('--max-retries', type=int, default=API_MAX_RETRIES, help='Retries per API request on rate limits, timeouts and 5xx')
+    parser.add_argument('--retry-rounds', type=int, default=FILE_RETRY_ROUNDS, help='Batch passes over files that failed on a transient API error')
+    parser.add_argument('--http-timeout', type=float, default=HTTP_TIMEOUT, help='Timeout in seconds for each API request')
+    parser.add_argument('--max-connections', type=int, default=HTTP_MAX_CONNECTIONS, help='Size of the shared HTTP connection pool')
+    parser.add_argument('--metrics-jsonl', type=Path, help='Append per-stage metrics of every recording to this JSON lines file (default: log them)')
+    parser.add_argument('--prometheus', type=Path, help='Write aggregated stage metrics to this Prometheus text file')
     args = parser.parse_args()
-    audio_path = args.audio_path or input("Enter path to audio file: ").strip()
-    process_audio_file(audio_path)
+    if args.chunk_overlap >= args.chunk_seconds * (1 - SILENCE_SEARCH_FRACTION):
+        parser.error(f"--chunk-overlap must be shorter than {1 - SILENCE_SEARCH_FRACTION:.0%} of --chunk-seconds")
+    instrumentation.configure(args.metrics_jsonl, args.prometheus)
+    configure_topics(args.topics)
+    configure_output(args.on_exists or ('version' if args.batch else 'ask'), args.sink)
+    configure_preprocessing(args.preprocess, args.uplink_mbps)
+    configure_cache(not args.no_cache, args.cache_dir, args.cache_max_mb)
+    configure_chunking(args.chunk_seconds, args.chunk_overlap, args.chunk_concurrency, args.chunk)
+    configure_scheduling(args.whisper_rpm, args.chat_rpm, args.chat_tpm, args.max_retries)
+    configure_client(timeout=args.http_timeout, max_connections=args.max_connections,
+                     max_keepalive=args.max_connections)
+    try:
+        if args.batch:
+            configure_stage_limits({
+                'decode': args.decode_limit,
+                'transcribe': args.transcribe_limit,
+                'summarize': args.summarize_limit,
+                'topics': args.topics_limit,
+            })
+            process_batch(args.batch, args.workers, args.decode_workers, args.retry_rounds)
+            return
+        audio_path = args.audio_path or input("Enter path to audio file: ").strip()
+        process_audio_file(audio_path)
+    except PipelineError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    finally:
+        for stats in validation_stats():
+            logging.info(f"Response validation: {json.dumps(stats)}")
+        for call, tokens in _token_usage.summary().items():
+            logging.info(f"Tokens for {call}: {json.dumps(tokens)}")
+        close_output()
+        close_client()
 
 
 if __name__ == "__main__":
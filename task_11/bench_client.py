@@ -0,0 +1,121 @@
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import openai
+
+# The shared OpenAI client lives in task_8
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'task_8'))
+from openai_client import create_client  # noqa: E402
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "bench",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer every POST with a fixed chat completion over keep-alive HTTP/1.1."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps(COMPLETION).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def chat(client: openai.OpenAI) -> None:
+    client.chat.completions.create(model="bench", messages=[{"role": "user", "content": "ping"}], max_tokens=1)
+
+
+def run(label: str, call: Callable[[], None], requests: int, concurrency: int, server: ThreadingHTTPServer) -> Dict[str, float]:
+    """Time each call, run requests times across concurrency threads, and count new TCP connections."""
+    connections_before = server.connections
+    latencies: List[float] = []
+
+    def timed(_: int) -> None:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "client": label,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "requests_per_sec": round(requests / elapsed, 1),
+        "tcp_connections": server.connections - connections_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a new OpenAI client per request with one shared pooled client against a local stub server.")
+    parser.add_argument('--requests', type=int, default=300, help='Requests per variant')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent requests')
+    args = parser.parse_args()
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    def per_request() -> None:
+        client = openai.OpenAI(api_key="bench", base_url=base_url, max_retries=0)
+        try:
+            chat(client)
+        finally:
+            client.close()
+
+    shared = create_client(api_key="bench", base_url=base_url, max_retries=0)
+    chat(shared)  # warm up the module imports and the first connection outside the timing
+    results = [
+        run("new client per request", per_request, args.requests, args.concurrency, server),
+        run("shared pooled client", lambda: chat(shared), args.requests, args.concurrency, server),
+    ]
+    shared.close()
+    server.shutdown()
+    saved = results[0]['mean_ms'] - results[1]['mean_ms']
+    print(json.dumps({
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+        "overhead_saved_ms_per_request": round(saved, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app import get_audio_duration, probe_duration
+from instrumentation import peak_rss_mb
+
+
+def measure(label: str, fn, audio_path: Path) -> dict:
+    """Run fn on the file and return its result, wall time and peak RSS after the call."""
+    start = time.perf_counter()
+    duration = fn(audio_path)
+    return {
+        "method": label,
+        "duration_sec": round(duration, 2) if duration is not None else None,
+        "wall_sec": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare header probing with full decoding for reading audio duration.")
+    parser.add_argument('audio_path', help='Audio file to measure (use an hour-long recording for realistic numbers)')
+    args = parser.parse_args()
+    audio_path = Path(args.audio_path)
+    baseline = round(peak_rss_mb(), 1)
+    # Probe first: peak RSS only grows, so the decode figure includes the probe's
+    results = [measure("probe", probe_duration, audio_path), measure("decode", get_audio_duration, audio_path)]
+    print(json.dumps({"file": str(audio_path), "baseline_rss_mb": baseline, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+# The size-bounded LRU directory is shared with task_9 and lives in task_8
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'task_8'))
+from dir_lru import DirectoryLRU  # noqa: E402
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def text_sha256(text: str) -> str:
+    """Return the SHA-256 hex digest of a text (UTF-8)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with path.open('rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """Content-addressed, size-bounded cache of pipeline stage outputs.
+
+    Entries are JSON files under ``root/<stage>/``, named by a hash of the audio
+    content hash plus the stage's model and prompt version. Writes are atomic, so
+    concurrent batches can share a cache. When the total size exceeds ``max_bytes``
+    the least recently used entries (by modification time, refreshed on every hit)
+    are evicted; the size is tracked incrementally, so a put does not scan the cache.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lru = DirectoryLRU(self.root, '*/*.json', max_bytes=max_bytes)
+
+    @staticmethod
+    def make_key(content_hash: str, *parts: Any) -> str:
+        """Combine the content hash with the model/prompt parts into one cache key."""
+        return hashlib.sha256('|'.join([content_hash, *map(str, parts)]).encode('utf-8')).hexdigest()
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.root / stage / f"{key}.json"
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Return the cached value for the stage and key, or None on a miss."""
+        path = self._path(stage, key)
+        try:
+            with path.open('r') as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """Store a value atomically and evict old entries if the cache is over its size limit."""
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        self._lru.replace(Path(tmp), path)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        self._lru.evict()
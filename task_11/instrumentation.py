@@ -0,0 +1,184 @@
+import contextvars
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+COUNTERS = ('bytes_uploaded', 'tokens_in', 'tokens_out', 'retries')
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar('current_run', default=None)
+_current_stage: contextvars.ContextVar = contextvars.ContextVar('current_stage', default=None)
+_sink_lock = threading.Lock()
+_settings: Dict[str, Optional[Path]] = {'jsonl': None, 'prometheus': None}
+_totals: Dict[str, Dict[str, float]] = {}
+_totals_files = {'value': 0}
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process so far in MB (a lifetime high-water mark)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class RunMetrics:
+    """Per-stage measurements for processing one recording."""
+
+    def __init__(self, recording: str):
+        self.recording = recording
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, stage: str, start: float) -> None:
+        """Mark a stage as running since start (time.perf_counter()), so snapshots include it."""
+        with self._lock:
+            self._started[stage] = start
+
+    def add(self, stage: str, **values: float) -> None:
+        """Add counter values (bytes_uploaded, tokens_in, ...) and wall_sec to a stage; rss_growth_mb keeps the maximum."""
+        with self._lock:
+            entry = self.stages.setdefault(stage, {'wall_sec': 0.0, **{name: 0 for name in COUNTERS}})
+            for name, value in values.items():
+                if name in COUNTERS or name == 'wall_sec':
+                    entry[name] += value
+                elif name == 'rss_growth_mb':
+                    entry[name] = max(entry.get(name, 0.0), value)
+                else:
+                    entry[name] = value
+            if 'wall_sec' in values:
+                self._started.pop(stage, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the measurements per stage. A stage that is still running is included
+        with its wall time so far."""
+        now = time.perf_counter()
+        with self._lock:
+            stages = {name: dict(values) for name, values in self.stages.items()}
+            for name, start in self._started.items():
+                entry = stages.setdefault(name, {'wall_sec': 0.0, **{counter: 0 for counter in COUNTERS}})
+                entry['wall_sec'] = round(entry['wall_sec'] + now - start, 3)
+            return stages
+
+
+@contextmanager
+def track_run(recording: str) -> Iterator[RunMetrics]:
+    """Collect measurements from every stage run inside this block for one recording."""
+    run = RunMetrics(recording)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Attribute measurements inside this block to the stage and record its wall time and how
+    much it raised the process peak RSS (the growth of ru_maxrss between start and end; while
+    other stages run concurrently, part of that growth may be theirs)."""
+    token = _current_stage.set(stage)
+    start = time.perf_counter()
+    start_peak = peak_rss_mb()
+    run = _current_run.get()
+    if run is not None:
+        run.begin(stage, start)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+        if run is not None:
+            run.add(stage, wall_sec=round(time.perf_counter() - start, 3), rss_growth_mb=round(peak_rss_mb() - start_peak, 1))
+
+
+def record(**values: float) -> None:
+    """Add counters (bytes_uploaded, tokens_in, tokens_out, retries) to the current stage, if any."""
+    run = _current_run.get()
+    stage = _current_stage.get()
+    if run is not None and stage is not None:
+        run.add(stage, **values)
+
+
+def record_usage(response: Any) -> None:
+    """Record the prompt and completion tokens reported in a chat completion response."""
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        record(tokens_in=getattr(usage, 'prompt_tokens', 0) or 0, tokens_out=getattr(usage, 'completion_tokens', 0) or 0)
+
+
+def bind_context(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap fn so it runs with the caller's run/stage context, e.g. in a thread pool.
+    Each call gets its own copy, so the wrapper can be used from several threads at once."""
+    context = contextvars.copy_context()
+
+    def wrapper(*args: Any) -> Any:
+        return context.copy().run(fn, *args)
+    return wrapper
+
+
+def format_sample(value: float) -> str:
+    """Format a Prometheus sample value exactly: integers as ints, other values with full precision."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def configure(jsonl_path: Optional[Path] = None, prometheus_path: Optional[Path] = None) -> None:
+    """Set where finished runs are emitted: a JSON lines file and/or a Prometheus text file."""
+    _settings.update(jsonl=jsonl_path, prometheus=prometheus_path)
+
+
+def emit(run: RunMetrics) -> None:
+    """Emit one run as a JSON line (to the file, or the log if none is set) and update the Prometheus file."""
+    line = json.dumps({"recording": run.recording, "timestamp": round(time.time(), 3), "stages": run.to_dict()})
+    with _sink_lock:
+        if _settings['jsonl'] is not None:
+            with open(_settings['jsonl'], 'a') as f:
+                f.write(line + "\n")
+        else:
+            logging.info(f"metrics {line}")
+        _totals_files['value'] += 1
+        for stage, values in run.to_dict().items():
+            totals = _totals.setdefault(stage, {'runs': 0, 'wall_sec': 0.0, 'rss_growth_mb': 0.0, **{name: 0 for name in COUNTERS}})
+            totals['runs'] += 1
+            totals['wall_sec'] += values.get('wall_sec', 0.0)
+            totals['rss_growth_mb'] = max(totals['rss_growth_mb'], values.get('rss_growth_mb', 0.0))
+            for name in COUNTERS:
+                totals[name] += values.get(name, 0)
+        if _settings['prometheus'] is not None:
+            write_prometheus(Path(_settings['prometheus']))
+
+
+def write_prometheus(path: Path) -> None:
+    """Write the aggregated stage metrics in the Prometheus text exposition format (atomically)."""
+    lines = [
+        "# HELP audio_pipeline_files_total Recordings processed.",
+        "# TYPE audio_pipeline_files_total counter",
+        f"audio_pipeline_files_total {_totals_files['value']}",
+        "# HELP audio_pipeline_peak_rss_megabytes Peak resident set size of the process.",
+        "# TYPE audio_pipeline_peak_rss_megabytes gauge",
+        f"audio_pipeline_peak_rss_megabytes {format_sample(round(peak_rss_mb(), 1))}",
+    ]
+    metrics = [
+        ('stage_runs_total', 'runs', 'counter', 'Stage executions.'),
+        ('stage_seconds_total', 'wall_sec', 'counter', 'Wall time spent in the stage.'),
+        ('stage_bytes_uploaded_total', 'bytes_uploaded', 'counter', 'Bytes uploaded by the stage.'),
+        ('stage_tokens_in_total', 'tokens_in', 'counter', 'Prompt tokens used by the stage.'),
+        ('stage_tokens_out_total', 'tokens_out', 'counter', 'Completion tokens used by the stage.'),
+        ('stage_retries_total', 'retries', 'counter', 'API retries in the stage.'),
+        ('stage_rss_growth_megabytes', 'rss_growth_mb', 'gauge', 'Largest rise of the process peak RSS during one run of the stage.'),
+    ]
+    for name, key, kind, help_text in metrics:
+        lines.append(f"# HELP audio_pipeline_{name} {help_text}")
+        lines.append(f"# TYPE audio_pipeline_{name} {kind}")
+        for stage, totals in sorted(_totals.items()):
+            lines.append(f'audio_pipeline_{name}{{stage="{stage}"}} {format_sample(totals[key])}')
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp, path)
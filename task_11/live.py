@@ -0,0 +1,371 @@
+import argparse
+import io
+import json
+import logging
+import queue
+import struct
+import sys
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from app import (
+    SUMMARY_MAX_TOKENS, WHISPER_MODEL, PipelineError, api_call, api_error, chat_summary, configure_scheduling,
+    extract_topics, get_result_subdir, get_speaking_speed_wpm, get_word_count, load_api_key, merge_overlap,
+    save_analysis, save_summary, save_transcription, setup_logging,
+)
+from openai_client import close_client, get_client  # task_8, on the path set by app
+
+LIVE_WINDOW_SECONDS = 15.0
+LIVE_OVERLAP_SECONDS = 1.0
+LIVE_SAMPLE_RATE = 16000
+LIVE_CHANNELS = 1
+LIVE_POLL_SECONDS = 0.5
+LIVE_IDLE_SECONDS = 10.0
+LIVE_CONCURRENCY = 2
+LIVE_SUMMARY_EVERY = 4
+LIVE_WPM_WINDOW_SECONDS = 60.0
+LIVE_PROMPT_WORDS = 30
+READ_BLOCK_BYTES = 64 * 1024
+
+
+class PcmFormat(NamedTuple):
+    sample_rate: int
+    channels: int
+    sample_width: int
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+
+def read_wav_header(f: BinaryIO) -> Optional[Tuple[PcmFormat, int]]:
+    """Parse a (possibly still growing) WAV header and return its format and the offset of
+    the sample data. The size fields are ignored, since a recorder may not have filled them
+    in yet. Returns None if the header is not complete yet."""
+    f.seek(0)
+    riff = f.read(12)
+    if len(riff) < 12:
+        return None
+    if riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise PipelineError("Live input file is not a WAV file; use raw PCM (.pcm/.raw) or WAV")
+    fmt: Optional[PcmFormat] = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+        if chunk_id == b'data':
+            if fmt is None:
+                raise PipelineError("WAV data chunk found before the fmt chunk")
+            return fmt, f.tell()
+        body = f.read(size + (size & 1))
+        if len(body) < size:
+            return None
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate = struct.unpack('<HHI', body[:8])
+            bits = struct.unpack('<H', body[14:16])[0]
+            if audio_format not in (1, 0xFFFE):
+                raise PipelineError("Only uncompressed PCM WAV input is supported in live mode")
+            fmt = PcmFormat(sample_rate, channels, bits // 8)
+
+
+def read_stream(stream: BinaryIO) -> Iterator[bytes]:
+    """Yield PCM blocks from a pipe (e.g. stdin) as soon as they are available, until EOF."""
+    read = getattr(stream, 'read1', stream.read)
+    while True:
+        block = read(READ_BLOCK_BYTES)
+        if not block:
+            return
+        yield block
+
+
+def tail_file(f: BinaryIO, poll: float = LIVE_POLL_SECONDS, idle_timeout: float = LIVE_IDLE_SECONDS) -> Iterator[bytes]:
+    """Yield new bytes appended to a growing file. The recording is considered finished
+    when the file has not grown for idle_timeout seconds."""
+    last_growth = time.monotonic()
+    while True:
+        block = f.read(READ_BLOCK_BYTES)
+        if block:
+            last_growth = time.monotonic()
+            yield block
+            continue
+        if time.monotonic() - last_growth > idle_timeout:
+            return
+        time.sleep(poll)
+
+
+def open_live_file(path: Path, fmt: PcmFormat, poll: float, idle_timeout: float) -> Tuple[PcmFormat, Iterator[bytes]]:
+    """Open a growing WAV or raw PCM file and return its format and a tailing iterator of
+    sample bytes. For WAV, waits until the recorder has written the header."""
+    f = path.open('rb')
+    if path.suffix.lower() == '.wav':
+        deadline = time.monotonic() + idle_timeout
+        while (parsed := read_wav_header(f)) is None:
+            if time.monotonic() > deadline:
+                raise PipelineError(f"No complete WAV header in '{path}' after {idle_timeout:g}s")
+            time.sleep(poll)
+        fmt, offset = parsed
+        f.seek(offset)
+    return fmt, tail_file(f, poll, idle_timeout)
+
+
+def iter_windows(blocks: Iterator[bytes], fmt: PcmFormat, window_sec: float,
+                 overlap_sec: float) -> Iterator[Tuple[float, float, bytes]]:
+    """Cut a PCM byte stream into fixed windows of window_sec, each overlapping the previous
+    one by overlap_sec. Yields (start_sec, end_sec, pcm) as soon as a window is complete;
+    the last, shorter window is yielded at the end of the stream."""
+    window_frames = max(1, int(window_sec * fmt.sample_rate))
+    step_frames = max(1, window_frames - int(overlap_sec * fmt.sample_rate))
+    window_bytes, step_bytes = window_frames * fmt.frame_bytes, step_frames * fmt.frame_bytes
+    buffer = bytearray()
+    start_frame = 0
+    for block in blocks:
+        buffer.extend(block)
+        while len(buffer) >= window_bytes:
+            yield start_frame / fmt.sample_rate, (start_frame + window_frames) / fmt.sample_rate, bytes(buffer[:window_bytes])
+            del buffer[:step_bytes]
+            start_frame += step_frames
+    frames = len(buffer) // fmt.frame_bytes
+    if frames > window_frames - step_frames or (start_frame == 0 and frames):
+        yield start_frame / fmt.sample_rate, (start_frame + frames) / fmt.sample_rate, bytes(buffer[:frames * fmt.frame_bytes])
+
+
+def pcm_to_wav(pcm: bytes, fmt: PcmFormat) -> bytes:
+    """Wrap raw PCM samples in an in-memory WAV container for upload."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(fmt.channels)
+        wav.setsampwidth(fmt.sample_width)
+        wav.setframerate(fmt.sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def transcribe_window(pcm: bytes, fmt: PcmFormat, index: int, prompt: str) -> str:
+    """Transcribe one window with Whisper, passing the end of the transcript so far as the
+    prompt to keep spelling and context consistent across windows."""
+    data = pcm_to_wav(pcm, fmt)
+    try:
+        response = api_call('whisper', lambda: get_client().audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=(f"live_{index:05d}.wav", data),
+            response_format="text",
+            prompt=prompt,
+        ))
+    except Exception as e:
+        raise api_error(f"Could not transcribe live window {index}.", e) from e
+    return response.strip()
+
+
+class LiveSession:
+    """Rolling state of a live transcription: the stitched transcript, word count, WPM,
+    per-window lag behind real time and a summary updated every few windows.
+
+    Summary updates run on a background thread so they never delay transcription; if an
+    update is still running, new text is folded into the next one.
+    """
+
+    def __init__(self, summary_every: int = LIVE_SUMMARY_EVERY):
+        self.transcript = ''
+        self.summary = ''
+        self.audio_sec = 0.0
+        self.windows = 0
+        self.lags: List[float] = []
+        self.summary_every = summary_every
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self._unsummarized: List[str] = []
+        self._summary_future: Optional[Future] = None
+        self._summarizer = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+
+    def prompt(self) -> str:
+        """Return the last words of the transcript, used as the Whisper prompt."""
+        with self._lock:
+            return ' '.join(self.transcript.split()[-LIVE_PROMPT_WORDS:])
+
+    def add(self, end_sec: float, text: str, lag: float) -> str:
+        """Stitch a window's text onto the transcript and return the newly added words."""
+        with self._lock:
+            before = len(self.transcript.split())
+            self.transcript = merge_overlap(self.transcript, text) if self.transcript else text
+            new_words = self.transcript.split()[before:]
+            self.audio_sec = max(self.audio_sec, end_sec)
+            self.windows += 1
+            self.lags.append(lag)
+            self._recent.append((end_sec, len(new_words)))
+            while self._recent and self._recent[0][0] < end_sec - LIVE_WPM_WINDOW_SECONDS:
+                self._recent.popleft()
+            if new_words:
+                self._unsummarized.append(' '.join(new_words))
+        if self.summary_every and self.windows % self.summary_every == 0:
+            self._update_summary()
+        return ' '.join(new_words)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the rolling word count, overall and recent WPM, and lag figures."""
+        with self._lock:
+            word_count = get_word_count(self.transcript)
+            span = min(LIVE_WPM_WINDOW_SECONDS, self.audio_sec)
+            recent_words = sum(words for _, words in self._recent)
+            return {
+                "word_count": word_count,
+                "speaking_speed_wpm": int(get_speaking_speed_wpm(word_count, self.audio_sec)),
+                "recent_wpm": int(get_speaking_speed_wpm(recent_words, span)),
+                "audio_sec": round(self.audio_sec, 1),
+                "lag_sec": round(self.lags[-1], 2) if self.lags else 0.0,
+            }
+
+    def _update_summary(self, wait: bool = False) -> None:
+        with self._lock:
+            if self._summary_future is not None and not self._summary_future.done():
+                if not wait:
+                    return
+                future = self._summary_future
+            else:
+                future = None
+        if future is not None:
+            future.result()
+        with self._lock:
+            if not self._unsummarized:
+                return
+            new_text, self._unsummarized = '\n'.join(self._unsummarized), []
+            previous = self.summary
+        self._summary_future = self._summarizer.submit(self._summarize, previous, new_text)
+        if wait:
+            self._summary_future.result()
+
+    def _summarize(self, previous: str, new_text: str) -> None:
+        try:
+            if previous:
+                summary = chat_summary(
+                    "Update the running summary of a live call with the new part of the transcript. "
+                    "Keep it as brief as possible, focusing only on the most important points:",
+                    f"Summary so far:\n{previous}\n\nNew transcript:\n{new_text}", SUMMARY_MAX_TOKENS
+                )
+            else:
+                summary = chat_summary(
+                    "Summarize the beginning of this live call as briefly as possible, focusing only on the most important points:",
+                    new_text, SUMMARY_MAX_TOKENS
+                )
+        except PipelineError as e:
+            logging.warning(f"Rolling summary update failed, keeping the previous one: {e}")
+            with self._lock:
+                self._unsummarized.insert(0, new_text)
+            return
+        with self._lock:
+            self.summary = summary
+        print(f"\n--- Rolling summary ({self.audio_sec:.0f}s) ---\n{summary}\n", flush=True)
+
+    def finish(self) -> None:
+        """Fold any remaining text into the summary and stop the summary thread."""
+        self._update_summary(wait=True)
+        self._summarizer.shutdown()
+
+
+def format_clock(seconds: float) -> str:
+    return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
+
+
+def run_live(windows: Iterator[Tuple[float, float, bytes]], fmt: PcmFormat, session: LiveSession,
+             concurrency: int = LIVE_CONCURRENCY) -> None:
+    """Transcribe windows as they arrive, up to concurrency at a time, and apply the results
+    to the session in order on a consumer thread, printing each window with rolling stats.
+    Lag is measured from the moment a window's audio was complete to its text being ready."""
+    results: "queue.Queue[Optional[Tuple[int, float, float, float, Future]]]" = queue.Queue()
+
+    def consume() -> None:
+        while (item := results.get()) is not None:
+            index, start_sec, end_sec, arrived, future = item
+            try:
+                text = future.result()
+            except PipelineError as e:
+                logging.warning(f"Skipping window {format_clock(start_sec)}-{format_clock(end_sec)}: {e}")
+                continue
+            new_text = session.add(end_sec, text, time.perf_counter() - arrived)
+            stats = session.stats()
+            print(f"[{format_clock(start_sec)}-{format_clock(end_sec)}] {new_text}", flush=True)
+            print(f"    words={stats['word_count']} wpm={stats['speaking_speed_wpm']} "
+                  f"recent_wpm={stats['recent_wpm']} lag={stats['lag_sec']:.1f}s", flush=True)
+
+    consumer = threading.Thread(target=consume, daemon=True)
+    consumer.start()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        try:
+            for index, (start_sec, end_sec, pcm) in enumerate(windows):
+                future = pool.submit(transcribe_window, pcm, fmt, index, session.prompt())
+                results.put((index, start_sec, end_sec, time.perf_counter(), future))
+        except KeyboardInterrupt:
+            logging.info("Live input interrupted, finishing the windows already captured...")
+        finally:
+            results.put(None)
+            consumer.join()
+    session.finish()
+
+
+def save_live_results(name: str, session: LiveSession) -> Path:
+    """Save the transcript, summary and analysis of a finished live session to results/."""
+    lags = session.lags or [0.0]
+    analysis = {
+        "word_count": get_word_count(session.transcript),
+        "speaking_speed_wpm": int(get_speaking_speed_wpm(get_word_count(session.transcript), session.audio_sec)),
+        "frequently_mentioned_topics": extract_topics(session.transcript) if session.transcript else [],
+        "live": {
+            "windows": session.windows,
+            "audio_sec": round(session.audio_sec, 1),
+            "mean_lag_sec": round(sum(lags) / len(lags), 2),
+            "max_lag_sec": round(max(lags), 2),
+        },
+    }
+    subdir = get_result_subdir(Path(name), 'version')
+    save_transcription(session.transcript, subdir)
+    save_summary(session.summary, subdir)
+    save_analysis(analysis, subdir)
+    print("\nAnalytics:\n", json.dumps(analysis, indent=2))
+    return subdir
+
+
+def main():
+    setup_logging()
+    load_api_key()
+    parser = argparse.ArgumentParser(description="Transcribe a live recording from a growing file or stdin in fixed windows.")
+    parser.add_argument('source', help="Growing .wav or raw PCM file, or '-' to read raw 16-bit PCM from stdin")
+    parser.add_argument('--name', help='Name of the results folder (default: file name, or live-<time> for stdin)')
+    parser.add_argument('--window-seconds', type=float, default=LIVE_WINDOW_SECONDS, help='Length of each transcribed window')
+    parser.add_argument('--overlap', type=float, default=LIVE_OVERLAP_SECONDS, help='Overlap between windows in seconds')
+    parser.add_argument('--sample-rate', type=int, default=LIVE_SAMPLE_RATE, help='Sample rate of raw PCM input')
+    parser.add_argument('--channels', type=int, default=LIVE_CHANNELS, help='Channels of raw PCM input')
+    parser.add_argument('--poll', type=float, default=LIVE_POLL_SECONDS, help='Seconds between checks of a growing file')
+    parser.add_argument('--idle-timeout', type=float, default=LIVE_IDLE_SECONDS, help='Stop when the file has not grown for this long')
+    parser.add_argument('--concurrency', type=int, default=LIVE_CONCURRENCY, help='Windows transcribed concurrently')
+    parser.add_argument('--summary-every', type=int, default=LIVE_SUMMARY_EVERY, help='Update the rolling summary every N windows (0 = only at the end)')
+    args = parser.parse_args()
+    configure_scheduling()
+    fmt = PcmFormat(args.sample_rate, args.channels, 2)
+    try:
+        if args.source == '-':
+            name = args.name or time.strftime('live-%Y%m%d-%H%M%S')
+            blocks = read_stream(sys.stdin.buffer)
+        else:
+            path = Path(args.source)
+            name = args.name or path.stem
+            fmt, blocks = open_live_file(path, fmt, args.poll, args.idle_timeout)
+        logging.info(f"Live transcription: {fmt.sample_rate} Hz, {fmt.channels} ch, "
+                     f"{args.window_seconds:g}s windows with {args.overlap:g}s overlap")
+        session = LiveSession(args.summary_every)
+        run_live(iter_windows(blocks, fmt, args.window_seconds, args.overlap), fmt, session, args.concurrency)
+        subdir = save_live_results(name, session)
+    except (OSError, PipelineError) as e:
+        logging.error(str(e))
+        sys.exit(1)
+    finally:
+        close_client()
+    print(f"\nResults saved to: {subdir}")
+
+
+if __name__ == "__main__":
+    main()
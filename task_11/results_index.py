@@ -0,0 +1,212 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RESULTS_DIR = Path('results')
+INDEX_FILE = 'index.sqlite'
+SEARCH_LIMIT = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    word_count INTEGER,
+    wpm INTEGER,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS recordings_wpm ON recordings (wpm);
+CREATE TABLE IF NOT EXISTS topics (
+    recording_id INTEGER NOT NULL REFERENCES recordings (id) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    mentions INTEGER
+);
+CREATE INDEX IF NOT EXISTS topics_recording ON topics (recording_id);
+CREATE INDEX IF NOT EXISTS topics_topic ON topics (topic COLLATE NOCASE);
+-- rowid = recordings.id
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5 (
+    transcript, summary, tokenize = 'porter unicode61'
+);
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the index database, creating the tables on first use."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    try:
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        raise RuntimeError(f"SQLite with FTS5 support is required for the results index: {e}") from e
+    return conn
+
+
+def read_text(path: Path) -> str:
+    try:
+        return path.read_text(encoding='utf-8')
+    except OSError:
+        return ''
+
+
+def result_folders(results_dir: Path) -> Iterator[Tuple[str, Path, float]]:
+    """Yield (name, folder, newest mtime of its result files) for every folder containing an analysis.json."""
+    for entry in results_dir.iterdir():
+        analysis = entry / 'analysis.json'
+        if not entry.is_dir() or not analysis.is_file():
+            continue
+        mtime = max((entry / name).stat().st_mtime for name in ('analysis.json', 'summary.md', 'transcription.md')
+                    if (entry / name).is_file())
+        yield entry.name, entry, mtime
+
+
+def index_folder(conn: sqlite3.Connection, name: str, folder: Path, mtime: float) -> None:
+    """Replace the index rows of one results folder."""
+    try:
+        analysis = json.loads(read_text(folder / 'analysis.json'))
+    except ValueError:
+        analysis = {}
+    if not isinstance(analysis, dict):
+        analysis = {}
+    topics = analysis.get('frequently_mentioned_topics')
+    if not isinstance(topics, list):
+        topics = []
+    transcript = read_text(folder / 'transcription.md')
+    summary = read_text(folder / 'summary.md')
+    remove_recording(conn, name)
+    recording_id = conn.execute(
+        "INSERT INTO recordings (name, mtime, word_count, wpm, summary) VALUES (?, ?, ?, ?, ?)",
+        (name, mtime, analysis.get('word_count'), analysis.get('speaking_speed_wpm'), summary.strip()),
+    ).lastrowid
+    conn.executemany(
+        "INSERT INTO topics (recording_id, topic, mentions) VALUES (?, ?, ?)",
+        [(recording_id, str(t.get('topic', '')), t.get('mentions')) for t in topics if isinstance(t, dict)],
+    )
+    conn.execute("INSERT INTO transcripts (rowid, transcript, summary) VALUES (?, ?, ?)", (recording_id, transcript, summary))
+
+
+def remove_recording(conn: sqlite3.Connection, name: str) -> None:
+    """Delete a recording with its topics and full-text entry (looked up by rowid, so this stays fast)."""
+    row = conn.execute("SELECT id FROM recordings WHERE name = ?", (name,)).fetchone()
+    if row is not None:
+        conn.execute("DELETE FROM transcripts WHERE rowid = ?", row)
+        conn.execute("DELETE FROM recordings WHERE id = ?", row)
+
+
+def update_index(conn: sqlite3.Connection, results_dir: Path = RESULTS_DIR) -> Dict[str, int]:
+    """Bring the index up to date with the results folder: (re)index folders whose files
+    changed since they were indexed and drop folders that no longer exist."""
+    indexed = dict(conn.execute("SELECT name, mtime FROM recordings"))
+    counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    seen = set()
+    with conn:
+        for name, folder, mtime in result_folders(results_dir):
+            seen.add(name)
+            if indexed.get(name) == mtime:
+                counts['unchanged'] += 1
+                continue
+            counts['updated' if name in indexed else 'added'] += 1
+            index_folder(conn, name, folder, mtime)
+        for name in indexed.keys() - seen:
+            remove_recording(conn, name)
+            counts['removed'] += 1
+    return counts
+
+
+def search(conn: sqlite3.Connection, query: Optional[str] = None, topic: Optional[str] = None,
+           min_wpm: Optional[int] = None, max_wpm: Optional[int] = None, min_words: Optional[int] = None,
+           limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """Find recordings by full-text query (FTS5 syntax, e.g. '"chest pain"' or 'pain NOT chest'),
+    topic substring and word count/WPM bounds. Text matches are ranked by relevance."""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if query:
+        sql = ("SELECT r.name, r.word_count, r.wpm, snippet(transcripts, 0, '[', ']', '...', 12) AS snippet "
+               "FROM transcripts JOIN recordings r ON r.id = transcripts.rowid WHERE transcripts MATCH ?")
+        params.append(query)
+        order = "ORDER BY transcripts.rank"
+    else:
+        sql = "SELECT r.name, r.word_count, r.wpm, NULL AS snippet FROM recordings r WHERE 1"
+        order = "ORDER BY r.name"
+    if topic:
+        conditions.append("EXISTS (SELECT 1 FROM topics t WHERE t.recording_id = r.id AND t.topic LIKE ?)")
+        params.append(f"%{topic}%")
+    if min_wpm is not None:
+        conditions.append("r.wpm >= ?")
+        params.append(min_wpm)
+    if max_wpm is not None:
+        conditions.append("r.wpm <= ?")
+        params.append(max_wpm)
+    if min_words is not None:
+        conditions.append("r.word_count >= ?")
+        params.append(min_words)
+    sql += ''.join(f" AND {condition}" for condition in conditions) + f" {order} LIMIT ?"
+    params.append(limit)
+    columns = ('recording', 'word_count', 'speaking_speed_wpm', 'snippet')
+    return [dict(zip(columns, row)) for row in conn.execute(sql, params)]
+
+
+def top_topics(conn: sqlite3.Connection, limit: int = SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    """Return the topics mentioned across the most recordings."""
+    rows = conn.execute(
+        "SELECT topic, COUNT(DISTINCT recording_id), SUM(mentions) FROM topics "
+        "GROUP BY topic COLLATE NOCASE ORDER BY 2 DESC, 3 DESC LIMIT ?", (limit,)
+    )
+    return [{"topic": topic, "recordings": recordings, "mentions": mentions} for topic, recordings, mentions in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query a full-text index over the results folder.")
+    parser.add_argument('--results', type=Path, default=RESULTS_DIR, help='Results folder to index')
+    parser.add_argument('--db', type=Path, help=f'Index database (default: <results>/{INDEX_FILE})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('update', help='Index new and changed results and drop removed ones')
+    search_parser = sub.add_parser('search', help='Search transcripts, topics, word counts and WPM')
+    search_parser.add_argument('query', nargs='?', help='Full-text query over transcripts (FTS5 syntax, e.g. \'"chest pain"\')')
+    search_parser.add_argument('--topic', help='Only recordings with a topic containing this text')
+    search_parser.add_argument('--min-wpm', type=int)
+    search_parser.add_argument('--max-wpm', type=int)
+    search_parser.add_argument('--min-words', type=int)
+    search_parser.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+    topics_parser = sub.add_parser('topics', help='List the topics found in the most recordings')
+    topics_parser.add_argument('--limit', type=int, default=SEARCH_LIMIT)
+    for query_parser in (search_parser, topics_parser):
+        # Updating stats every results folder, so queries skip it unless asked
+        query_parser.add_argument('--update', action='store_true', help='Update the index before querying')
+    args = parser.parse_args()
+    if not args.results.is_dir():
+        print(f"Results folder not found: {args.results}", file=sys.stderr)
+        sys.exit(1)
+    conn = connect(args.db or args.results / INDEX_FILE)
+    try:
+        empty = conn.execute("SELECT 1 FROM recordings LIMIT 1").fetchone() is None
+        if args.command == 'update' or args.update or empty:
+            start = time.perf_counter()
+            counts = update_index(conn, args.results)
+            print(f"Index updated in {(time.perf_counter() - start) * 1000:.0f} ms: {counts}", file=sys.stderr)
+        if args.command == 'update':
+            return
+        start = time.perf_counter()
+        if args.command == 'topics':
+            rows = top_topics(conn, args.limit)
+        else:
+            try:
+                rows = search(conn, args.query, args.topic, args.min_wpm, args.max_wpm, args.min_words, args.limit)
+            except sqlite3.OperationalError as e:
+                print(f"Invalid search query: {e}", file=sys.stderr)
+                sys.exit(1)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for row in rows:
+            print(json.dumps(row))
+        print(f"{len(rows)} results in {elapsed_ms:.1f} ms", file=sys.stderr)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
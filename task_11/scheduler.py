@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Optional
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {'RateLimitError', 'APITimeoutError', 'APIConnectionError', 'InternalServerError', 'Timeout', 'TimeoutError'}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True for rate limits, timeouts, connection errors and 5xx responses."""
+    if getattr(error, 'status_code', None) in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Return the server's Retry-After delay in seconds, if the error carries one."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        value = headers.get('retry-after')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Blocking token bucket refilled continuously at rate_per_minute, holding at most one minute's worth."""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take amount tokens, sleeping until they are available; returns the time waited.
+        Requests larger than the capacity are allowed once the bucket is full."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """Stop calling an API after repeated failures.
+
+    After failure_threshold consecutive failures the breaker opens and callers wait
+    for reset_timeout; then a single trial call is let through (half-open). Success
+    closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self._cond = threading.Condition()
+
+    def before_call(self) -> None:
+        """Block while the breaker is open or another trial call is in flight."""
+        with self._cond:
+            while self.opened_at is not None:
+                remaining = self.opened_at + self.reset_timeout - time.monotonic()
+                if remaining <= 0 and not self.trial_running:
+                    self.trial_running = True
+                    return
+                self._cond.wait(timeout=remaining if remaining > 0 else None)
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+            self._cond.notify_all()
+
+    def on_failure(self) -> None:
+        with self._cond:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.trial_running:
+                    logging.warning(f"Circuit breaker open for {self.reset_timeout:g}s after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+            self._cond.notify_all()
+
+
+class RequestScheduler:
+    """Rate-limited, retrying executor shared by all calls to one API.
+
+    Calls wait for a request slot (requests per minute) and, when tokens_per_minute
+    is set, for their estimated tokens. Retryable errors are retried with full-jitter
+    exponential backoff (or the server's Retry-After), through a circuit breaker.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def call(self, fn: Callable[[], Any], tokens: int = 0, on_retry: Optional[Callable[[], None]] = None) -> Any:
+        """Run fn under the rate limits, retrying retryable errors; re-raises the last error."""
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            self.requests.acquire()
+            if self.tokens is not None and tokens:
+                self.tokens.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The API answered (bad request, auth, oversized prompt), so it is reachable:
+                    # such errors must not open the breaker for every other caller
+                    self.breaker.on_success()
+                    raise
+                self.breaker.on_failure()
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                logging.warning(f"{self.name}: {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                if on_retry is not None:
+                    on_retry()
+                time.sleep(delay)
+                continue
+            self.breaker.on_success()
+            return result
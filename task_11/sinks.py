@@ -0,0 +1,125 @@
+import importlib.util
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+PARQUET_CHECKPOINT_RECORDS = 25
+
+
+class JsonlSink:
+    """Append one JSON record per processed recording to a single JSON Lines file.
+
+    Records are written and flushed under a lock, so batch workers can share one
+    sink. The names of recordings already in the file are loaded on open, which
+    lets the skip-if-complete policy resume an interrupted run. A partial last line
+    left by a crash is cut off, so the next record starts on a line of its own.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._names: Set[str] = set()
+        if self.path.exists():
+            complete = 0
+            with self.path.open('rb+') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        logging.warning(f"{self.path}: dropping incomplete last record ({len(line)} bytes)")
+                        f.truncate(complete)
+                        break
+                    complete += len(line)
+                    try:
+                        self._names.add(json.loads(line)['recording'])
+                    except (ValueError, KeyError):
+                        continue
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open('a')
+
+    def contains(self, name: str) -> bool:
+        """Return True if a record for the recording name was already written."""
+        with self._lock:
+            return name in self._names
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append a record (must contain 'recording') and flush it to disk."""
+        with self._lock:
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._names.add(record['recording'])
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ParquetSink:
+    """Write records as a Parquet dataset directory of immutable part files (requires pyarrow).
+
+    A Parquet file is only readable once its footer is written, so records are buffered
+    and every checkpoint_every records (and on close) the buffer is written as a new
+    part file, ``<path>/part-00001.parquet``, ``part-00002.parquet``, ... Parts are written
+    under a hidden temporary name and renamed, so a crash loses at most the records since
+    the last checkpoint. Flushed records are dropped from memory, so memory and write I/O
+    stay proportional to one checkpoint however long the run is. Read the whole dataset
+    with ``pyarrow.parquet.read_table(path)``.
+    """
+
+    def __init__(self, path: Path, checkpoint_every: int = PARQUET_CHECKPOINT_RECORDS):
+        if importlib.util.find_spec('pyarrow') is None:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        self.path = Path(path)
+        if self.path.is_file():
+            raise RuntimeError(f"{self.path} is a file; Parquet output is written as a dataset directory of part files")
+        self._lock = threading.Lock()
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._buffer: List[Dict[str, Any]] = []
+        self._names: Set[str] = set()
+        self._parts = 0
+        if self.path.is_dir():
+            import pyarrow.parquet as pq
+            for part in sorted(self.path.glob('part-*.parquet')):
+                self._names.update(pq.read_table(part, columns=['recording']).column('recording').to_pylist())
+                self._parts = max(self._parts, int(part.stem.split('-')[1]))
+
+    def contains(self, name: str) -> bool:
+        """Return True if a record for the recording name is already present."""
+        with self._lock:
+            return name in self._names
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Buffer a record and write a part file every checkpoint_every records;
+        nested values are stored as JSON strings."""
+        flat = {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in record.items()}
+        with self._lock:
+            self._buffer.append(flat)
+            self._names.add(record['recording'])
+            if len(self._buffer) >= self.checkpoint_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered records as the next part file via a temporary file and rename."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._parts += 1
+        part = self.path / f"part-{self._parts:05d}.parquet"
+        tmp = self.path / f".{part.name}.tmp"
+        pq.write_table(pa.Table.from_pylist(self._buffer), tmp)
+        tmp.replace(part)
+        self._buffer = []
+
+    def close(self) -> None:
+        """Write the records not yet flushed."""
+        with self._lock:
+            if self._buffer:
+                self._flush()
+
+
+def open_sink(path: Path):
+    """Open a JSONL sink, or a Parquet dataset directory if the path ends in .parquet."""
+    path = Path(path)
+    if path.suffix.lower() == '.parquet':
+        return ParquetSink(path)
+    return JsonlSink(path)
@@ -0,0 +1,92 @@
+import unittest
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from app import group_mentions, local_topic_candidates, merge_overlap, plan_chunks
+
+
+def tone(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms)
+
+
+class TestPlanChunks(unittest.TestCase):
+    def test_short_audio_is_one_chunk(self):
+        self.assertEqual(plan_chunks(tone(3000), 10000, 500), [(0, 3000)])
+
+    def test_cuts_in_the_middle_of_a_silence(self):
+        audio = tone(8500) + AudioSegment.silent(duration=1000) + tone(5500)
+        self.assertEqual(plan_chunks(audio, 10000, 500), [(0, 9000), (8500, 15000)])
+
+    def test_hard_cuts_without_silence(self):
+        self.assertEqual(plan_chunks(tone(25000), 10000, 1000), [(0, 10000), (9000, 19000), (18000, 25000)])
+
+    def test_chunks_cover_the_audio_and_respect_the_limit(self):
+        audio = tone(25000)
+        bounds = plan_chunks(audio, 7000, 700)
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], len(audio))
+        for (start, end), (next_start, _) in zip(bounds, bounds[1:]):
+            self.assertEqual(next_start, end - 700)
+        self.assertTrue(all(end - start <= 7000 for start, end in bounds))
+
+    def test_overlap_must_fit_before_the_silence_window(self):
+        with self.assertRaises(ValueError):
+            plan_chunks(tone(25000), 10000, 8000)
+
+
+class TestMergeOverlap(unittest.TestCase):
+    def test_drops_repeated_words(self):
+        self.assertEqual(merge_overlap("the patient reported chest pain", "Chest pain, since Monday"),
+                         "the patient reported chest pain since Monday")
+
+    def test_prefers_the_longest_repeat(self):
+        self.assertEqual(merge_overlap("a b a b", "a b a b c"), "a b a b c")
+
+    def test_no_overlap(self):
+        self.assertEqual(merge_overlap("first part.", "second part."), "first part. second part.")
+
+    def test_repeats_beyond_max_words_are_kept(self):
+        self.assertEqual(merge_overlap("x y z", "y z w", max_words=1), "x y z y z w")
+
+    def test_empty_sides(self):
+        self.assertEqual(merge_overlap("", "hello there"), "hello there")
+        self.assertEqual(merge_overlap("hello there", ""), "hello there")
+
+
+class TestLocalTopicCandidates(unittest.TestCase):
+    TRANSCRIPT = ("We discussed the chest pain. The chest pain started on Monday. "
+                  "Chest pain again at night, and the blood pressure was high. Blood pressure is fine now. "
+                  "Monday was busy.")
+
+    def test_counts_phrases_seen_twice(self):
+        topics = {t['topic']: t['mentions'] for t in local_topic_candidates(self.TRANSCRIPT)}
+        self.assertEqual(topics['chest pain'], 3)
+        self.assertEqual(topics['blood pressure'], 2)
+        self.assertEqual(topics['monday'], 2)
+
+    def test_drops_stopwords_and_contained_phrases(self):
+        topics = [t['topic'] for t in local_topic_candidates(self.TRANSCRIPT)]
+        self.assertNotIn('the', topics)
+        self.assertNotIn('chest', topics)
+        self.assertNotIn('pressure', topics)
+
+    def test_limit_and_empty_transcript(self):
+        self.assertEqual(len(local_topic_candidates(self.TRANSCRIPT, limit=1)), 1)
+        self.assertEqual(local_topic_candidates(''), [])
+
+
+class TestGroupMentions(unittest.TestCase):
+    def test_nested_phrases_are_not_counted_twice(self):
+        self.assertEqual(group_mentions({'chest pain': 3, 'chest': 4, 'pain': 3}), 4)
+
+    def test_only_the_smallest_container_is_subtracted(self):
+        self.assertEqual(group_mentions({'severe chest pain': 1, 'chest pain': 3, 'pain': 5}), 5)
+
+    def test_unrelated_phrases_add_up(self):
+        self.assertEqual(group_mentions({'blood pressure': 2, 'heart rate': 3}), 5)
+        self.assertEqual(group_mentions({}), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
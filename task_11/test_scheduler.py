@@ -0,0 +1,63 @@
+import unittest
+
+from scheduler import CircuitBreaker, RequestScheduler, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing(status_code: int):
+    def fn():
+        raise StatusError(status_code)
+    return fn
+
+
+class TestIsRetryable(unittest.TestCase):
+    def test_status_codes(self):
+        self.assertTrue(is_retryable(StatusError(429)))
+        self.assertTrue(is_retryable(StatusError(503)))
+        self.assertFalse(is_retryable(StatusError(400)))
+        self.assertFalse(is_retryable(StatusError(401)))
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def scheduler(self, breaker: CircuitBreaker) -> RequestScheduler:
+        return RequestScheduler('test', 60000, max_retries=0, base_delay=0, breaker=breaker)
+
+    def test_non_retryable_errors_leave_breaker_closed(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        scheduler = self.scheduler(breaker)
+        for _ in range(10):
+            with self.assertRaises(StatusError):
+                scheduler.call(failing(400))
+        self.assertIsNone(breaker.opened_at)
+        self.assertEqual(breaker.failures, 0)
+        self.assertEqual(scheduler.call(lambda: "ok"), "ok")
+
+    def test_retryable_errors_open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        scheduler = self.scheduler(breaker)
+        for _ in range(3):
+            with self.assertRaises(StatusError):
+                scheduler.call(failing(503))
+        self.assertIsNotNone(breaker.opened_at)
+
+    def test_retries_until_success(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise StatusError(429)
+            return "ok"
+
+        scheduler = RequestScheduler('test', 60000, max_retries=5, base_delay=0, breaker=CircuitBreaker())
+        self.assertEqual(scheduler.call(flaky), "ok")
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
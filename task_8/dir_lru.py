@@ -0,0 +1,89 @@
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+LOW_WATER = 0.9
+
+
+class DirectoryLRU:
+    """
+    Keeps the files matching ``pattern`` under ``root`` within a size and/or count limit,
+    deleting the least recently used ones (by modification time) first.
+
+    The total size and count are tracked incrementally as files are written, so a write
+    costs O(1). The directory is only scanned on the first write and when a limit is
+    crossed; eviction then goes down to LOW_WATER of the limit, so the next scan is many
+    writes away. Each scan also corrects drift from other processes sharing the directory.
+
+    Usage example:
+    --------------
+    >>> lru = DirectoryLRU(Path(".cache"), "*/*.json", max_bytes=500 * 1024 * 1024)
+    >>> lru.replace(tmp_path, final_path)  # doctest: +SKIP
+    """
+
+    def __init__(self, root: Path, pattern: str, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        self.root = Path(root)
+        self.pattern = pattern
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self._count = 0
+        self.scans = 0
+
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        self.scans += 1
+        self._total_bytes = sum(size for _, size, _ in entries)
+        self._count = len(entries)
+        return entries
+
+    def _over(self, total_bytes: int, count: int, fraction: float = 1.0) -> bool:
+        return ((self.max_bytes is not None and total_bytes > self.max_bytes * fraction)
+                or (self.max_entries is not None and count > self.max_entries * fraction))
+
+    def replace(self, tmp: Path, path: Path) -> None:
+        """Move a fully written temporary file into place atomically, account for it,
+        and evict least recently used files if a limit is now exceeded."""
+        try:
+            previous: Optional[int] = path.stat().st_size
+        except OSError:
+            previous = None
+        size = os.path.getsize(tmp)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._total_bytes is None:
+                self._scan()
+            else:
+                self._total_bytes += size - (previous or 0)
+                self._count += previous is None
+            if self._over(self._total_bytes, self._count):
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._scan())
+        total, count = self._total_bytes or 0, self._count
+        for _, size, path in entries:
+            if not self._over(total, count, LOW_WATER):
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+        self._total_bytes, self._count = total, count
+
+    def evict(self) -> None:
+        """Rescan the directory and delete least recently used files down to LOW_WATER of the limits."""
+        with self._lock:
+            self._scan()
+            if self._over(self._total_bytes or 0, self._count):
+                self._evict()
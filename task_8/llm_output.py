@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from schema import ValidationError, Validator
+
+
+def extract_json(text: Optional[str]) -> Any:
+    """
+    Parses the JSON value in a model response.
+    Text around the outermost [...] or {...} (explanations, markdown code fences) is ignored.
+
+    Raises:
+    -------
+        ValidationError: If the response contains no valid JSON.
+    """
+    text = (text or "").strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    starts = [index for index in (text.find("["), text.find("{")) if index >= 0]
+    if not starts:
+        raise ValidationError("Response does not contain JSON")
+    start = min(starts)
+    end = text.rfind("]" if text[start] == "[" else "}") + 1
+    try:
+        return json.loads(text[start:end])
+    except ValueError as e:
+        raise ValidationError(f"Response is not valid JSON: {e}") from e
+
+
+def repair_messages(messages: List[Dict[str, str]], response: str, error: str, expected: str) -> List[Dict[str, str]]:
+    """
+    Builds the messages for a targeted repair request: the original conversation, the invalid
+    response, and a short instruction naming the exact validation error.
+    """
+    return messages + [
+        {"role": "assistant", "content": response},
+        {
+            "role": "user",
+            "content": f"Your response could not be used: {error}. "
+                       f"Reply with only the corrected JSON: {expected}.",
+        },
+    ]
+
+
+class ResponseValidator:
+    """
+    Parses and validates JSON output of a language model against a schema.
+
+    The schema is compiled once. If a response is invalid, parse_with_repair() asks for
+    one corrected response instead of silently discarding the output. Time spent on
+    parsing and validation is accumulated, so the overhead per response can be reported.
+
+    Usage example:
+    --------------
+    >>> from schema import Schema
+    >>> topics = ResponseValidator("topics", Schema.array(Schema.object({
+    ...     "topic": Schema.string(),
+    ...     "mentions": Schema.number(),
+    ... })))
+    >>> topics.parse('[{"topic": "Budget", "mentions": 3}]')
+    [{'topic': 'Budget', 'mentions': 3}]
+    """
+
+    def __init__(self, name: str, schema: Validator[Any]):
+        self.name = name
+        self._check = schema.compile()
+        self._lock = threading.Lock()
+        self._counts = {"responses": 0, "invalid": 0, "repairs": 0, "repaired": 0}
+        self._parse_sec = 0.0
+        self._validate_sec = 0.0
+
+    def parse(self, text: Optional[str]) -> Any:
+        """
+        Parses and validates one response.
+
+        Raises:
+        -------
+            ValidationError: If the response is not valid JSON or does not match the schema.
+        """
+        start = time.perf_counter()
+        try:
+            value = extract_json(text)
+            parsed = time.perf_counter()
+            self._check(value)
+        except ValidationError:
+            with self._lock:
+                self._counts["responses"] += 1
+                self._counts["invalid"] += 1
+            raise
+        validated = time.perf_counter()
+        with self._lock:
+            self._counts["responses"] += 1
+            self._parse_sec += parsed - start
+            self._validate_sec += validated - parsed
+        return value
+
+    def parse_with_repair(self, text: Optional[str], repair: Callable[[str, str], Optional[str]]) -> Any:
+        """
+        Parses a response; if it is invalid, calls repair(response, error message) once to get
+        a corrected response and parses that instead.
+
+        Raises:
+        -------
+            ValidationError: If the repaired response is invalid too.
+        """
+        try:
+            return self.parse(text)
+        except ValidationError as e:
+            with self._lock:
+                self._counts["repairs"] += 1
+            value = self.parse(repair(text or "", e.message))
+            with self._lock:
+                self._counts["repaired"] += 1
+            return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the response counts and the mean parse and validation time per valid response."""
+        with self._lock:
+            valid = self._counts["responses"] - self._counts["invalid"]
+            return {
+                "validator": self.name,
+                **self._counts,
+                "mean_parse_us": round(self._parse_sec / valid * 1e6, 1) if valid else 0.0,
+                "mean_validate_us": round(self._validate_sec / valid * 1e6, 1) if valid else 0.0,
+            }
@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+import openai
+
+HTTP_TIMEOUT = 120.0
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_MAX_CONNECTIONS = 32
+HTTP_MAX_KEEPALIVE = 16
+HTTP_KEEPALIVE_EXPIRY = 60.0
+HTTP_MAX_RETRIES = 2
+
+_settings: Dict[str, Any] = {
+    'api_key': None,
+    'base_url': None,
+    'timeout': HTTP_TIMEOUT,
+    'connect_timeout': HTTP_CONNECT_TIMEOUT,
+    'max_connections': HTTP_MAX_CONNECTIONS,
+    'max_keepalive': HTTP_MAX_KEEPALIVE,
+    'max_retries': HTTP_MAX_RETRIES,
+}
+_client: Optional[openai.OpenAI] = None
+_lock = threading.Lock()
+
+
+def configure_client(**settings: Any) -> None:
+    """Update the client settings (api_key, base_url, timeout, connect_timeout, max_connections,
+    max_keepalive, max_retries). If a setting changed, the current client is closed and a new
+    one is created on next use; calling it again with the same settings keeps the client."""
+    unknown = settings.keys() - _settings.keys()
+    if unknown:
+        raise TypeError(f"Unknown client settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        if any(_settings[name] != value for name, value in settings.items()):
+            _settings.update(settings)
+            _close()
+
+
+def create_client(**overrides: Any) -> openai.OpenAI:
+    """Create a new OpenAI client with its own HTTP connection pool. max_retries sets the SDK's
+    own retries; set it to 0 when a request scheduler retries instead."""
+    settings = {**_settings, **overrides}
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings['max_connections'],
+            max_keepalive_connections=settings['max_keepalive'],
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings['timeout'], connect=settings['connect_timeout']),
+        follow_redirects=True,
+    )
+    return openai.OpenAI(api_key=settings['api_key'], base_url=settings['base_url'],
+                         max_retries=settings['max_retries'], http_client=http_client)
+
+
+def get_client() -> openai.OpenAI:
+    """Return the shared client, creating it on first use. Every API call goes through this
+    one client, so HTTP keep-alive connections and TLS sessions are reused across calls and threads."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = create_client()
+    return _client
+
+
+def _close() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+def close_client() -> None:
+    """Close the shared client and its connections."""
+    with _lock:
+        _close()
@@ -96,6 +96,30 @@ class Validator(Generic[T]):
             if not rule(value):
                 raise ValidationError(message)
 
+    def compile(self) -> Callable[[Any], None]:
+        """
+        Compiles the validator into a standalone check function.
+        The function raises the same ValidationError messages as validate(), but the
+        rules, nested validators and object keys are resolved once up front, which makes
+        it faster for validating many values against the same schema.
+
+        Rules added to the validator after compiling are not seen by the compiled function.
+
+        Returns:
+        --------
+            Callable[[Any], None]: A function that validates a value or raises ValidationError.
+        """
+        rules = tuple(self._rules)
+        is_optional = self._is_optional
+
+        def check(value: Any) -> None:
+            if is_optional and value is None:
+                return
+            for rule, message in rules:
+                if not rule(value):
+                    raise ValidationError(message)
+        return check
+
 
 class ArrayValidator(Validator[List[T]]):
     """
@@ -145,6 +169,27 @@ class ArrayValidator(Validator[List[T]]):
                 # Wrap item validation errors with context
                 raise ValidationError(f"Invalid item in array: {e.message}") from e
 
+    def compile(self) -> Callable[[Any], None]:
+        """
+        Compiles the array validator and its item validator into one check function.
+        See Validator.compile().
+        """
+        check_array = super().compile()
+        check_item = self._item_validator.compile()
+        is_optional = self._is_optional
+
+        def check(value: Any) -> None:
+            check_array(value)
+            if is_optional and value is None:
+                return
+            # One try block around the loop instead of one per item
+            try:
+                for item in value:
+                    check_item(item)
+            except ValidationError as e:
+                raise ValidationError(f"Invalid item in array: {e.message}") from e
+        return check
+
 
 class ObjectValidator(Validator[Dict]):
     """
@@ -233,6 +278,40 @@ class ObjectValidator(Validator[Dict]):
                         f"Invalid value for key '{key}': {e.message}"
                     ) from e
 
+    def compile(self) -> Callable[[Any], None]:
+        """
+        Compiles the object validator and all field validators into one check function.
+        Known keys are collected into a frozenset once. See Validator.compile().
+        """
+        check_object = super().compile()
+        fields = tuple(
+            (key, validator.compile(), validator._is_optional)
+            for key, validator in self._schema.items()
+        )
+        known_keys = frozenset(self._schema)
+        unknown_keys_allowed = self._unknown_keys_allowed
+        is_optional = self._is_optional
+
+        def check(value: Any) -> None:
+            check_object(value)
+            if is_optional and value is None:
+                return
+            if not unknown_keys_allowed:
+                for key in value:
+                    if key not in known_keys:
+                        raise ValidationError(f"Unexpected key '{key}' in object")
+            for key, check_field, field_optional in fields:
+                if key in value:
+                    try:
+                        check_field(value[key])
+                    except ValidationError as e:
+                        raise ValidationError(
+                            f"Invalid value for key '{key}': {e.message}"
+                        ) from e
+                elif not field_optional:
+                    raise ValidationError(f"Missing key '{key}' in object")
+        return check
+
 
 class StringValidator(Validator[str]):
     """
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from dir_lru import DirectoryLRU
+
+
+class TestDirectoryLRU(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, lru: DirectoryLRU, name: str, size: int = 10) -> Path:
+        path = self.root / f"{name}.json"
+        tmp = self.root / f"{name}.tmp"
+        tmp.write_bytes(b"x" * size)
+        lru.replace(tmp, path)
+        return path
+
+    def test_evicts_least_recently_used_by_count(self):
+        lru = DirectoryLRU(self.root, "*.json", max_entries=10)
+        for i in range(11):
+            path = self.write(lru, f"e{i}")
+            os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+        remaining = sorted(p.stem for p in self.root.glob("*.json"))
+        self.assertEqual(len(remaining), 9)
+        self.assertNotIn("e0", remaining)
+        self.assertIn("e10", remaining)
+
+    def test_evicts_by_size(self):
+        lru = DirectoryLRU(self.root, "*.json", max_bytes=100)
+        for i in range(20):
+            self.write(lru, f"e{i}", size=10)
+        self.assertLessEqual(sum(p.stat().st_size for p in self.root.glob("*.json")), 100)
+
+    def test_scans_only_when_a_limit_is_crossed(self):
+        lru = DirectoryLRU(self.root, "*.json", max_entries=100)
+        for i in range(300):
+            self.write(lru, f"e{i}")
+        # First write, then one scan per 10 writes past the limit instead of one per write
+        self.assertLess(lru.scans, 30)
+        self.assertLessEqual(len(list(self.root.glob("*.json"))), 100)
+
+    def test_overwrite_does_not_count_twice(self):
+        lru = DirectoryLRU(self.root, "*.json", max_entries=2)
+        for _ in range(5):
+            self.write(lru, "same")
+        self.write(lru, "other")
+        self.assertEqual(sorted(p.stem for p in self.root.glob("*.json")), ["other", "same"])
+
+
+if __name__ == "__main__":
+    unittest.main()
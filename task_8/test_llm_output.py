@@ -0,0 +1,82 @@
+import unittest
+
+from llm_output import ResponseValidator, extract_json, repair_messages
+from schema import Schema, ValidationError
+
+
+def topics_validator() -> ResponseValidator:
+    return ResponseValidator("topics", Schema.array(Schema.object({
+        "topic": Schema.string().min_length(1),
+        "mentions": Schema.number().non_negative(),
+    })))
+
+
+class TestExtractJson(unittest.TestCase):
+    def test_plain_json(self):
+        self.assertEqual(extract_json('[{"a": 1}]'), [{"a": 1}])
+
+    def test_code_fence_and_surrounding_text(self):
+        self.assertEqual(extract_json('Here you go:\n```json\n[1, 2]\n```'), [1, 2])
+        self.assertEqual(extract_json('Result: {"a": [1]} done'), {"a": [1]})
+
+    def test_no_json(self):
+        with self.assertRaisesRegex(ValidationError, "does not contain JSON"):
+            extract_json("Sorry, I cannot help with that.")
+        with self.assertRaisesRegex(ValidationError, "not valid JSON"):
+            extract_json("[1, 2")
+        with self.assertRaisesRegex(ValidationError, "does not contain JSON"):
+            extract_json(None)
+
+
+class TestResponseValidator(unittest.TestCase):
+    def test_valid_response(self):
+        validator = topics_validator()
+        self.assertEqual(validator.parse('[{"topic": "Budget", "mentions": 3}]'), [{"topic": "Budget", "mentions": 3}])
+        stats = validator.stats()
+        self.assertEqual((stats["responses"], stats["invalid"], stats["repairs"]), (1, 0, 0))
+        self.assertGreaterEqual(stats["mean_validate_us"], 0)
+
+    def test_schema_error(self):
+        validator = topics_validator()
+        with self.assertRaisesRegex(ValidationError, "Invalid value for key 'mentions'"):
+            validator.parse('[{"topic": "Budget", "mentions": "3"}]')
+        self.assertEqual(validator.stats()["invalid"], 1)
+
+    def test_repair_is_called_once_with_the_error(self):
+        validator = topics_validator()
+        calls = []
+
+        def repair(response, error):
+            calls.append((response, error))
+            return '[{"topic": "Budget", "mentions": 3}]'
+
+        value = validator.parse_with_repair('[{"topic": "Budget"}]', repair)
+        self.assertEqual(value, [{"topic": "Budget", "mentions": 3}])
+        self.assertEqual(len(calls), 1)
+        self.assertIn("Missing key 'mentions'", calls[0][1])
+        self.assertEqual(validator.stats()["repaired"], 1)
+
+    def test_valid_response_is_not_repaired(self):
+        validator = topics_validator()
+        validator.parse_with_repair('[]', lambda response, error: self.fail("repair called"))
+        self.assertEqual(validator.stats()["repairs"], 0)
+
+    def test_failed_repair_raises(self):
+        validator = topics_validator()
+        with self.assertRaises(ValidationError):
+            validator.parse_with_repair("no json", lambda response, error: "still no json")
+        self.assertEqual(validator.stats()["repaired"], 0)
+
+
+class TestRepairMessages(unittest.TestCase):
+    def test_appends_response_and_error(self):
+        messages = [{"role": "user", "content": "List topics"}]
+        repaired = repair_messages(messages, "[oops", "Response is not valid JSON", "a JSON list")
+        self.assertEqual(repaired[:1], messages)
+        self.assertEqual(repaired[1], {"role": "assistant", "content": "[oops"})
+        self.assertIn("Response is not valid JSON", repaired[2]["content"])
+        self.assertEqual(len(messages), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
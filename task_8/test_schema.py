@@ -1,3 +1,4 @@
+import re
 import unittest
 
 from schema import (
@@ -356,6 +357,52 @@ class TestObjectValidator(unittest.TestCase):
         self.assertIsNone(validator.validate({"name": "John", "age": 30}))
 
 
+class TestCompiledValidator(unittest.TestCase):
+    def setUp(self):
+        self.schema = Schema.object({
+            "topic": Schema.string().min_length(1),
+            "mentions": Schema.number().non_negative(),
+            "tags": Schema.array(Schema.string()).optional(),
+        })
+
+    def assertSameResult(self, validator, value):
+        check = validator.compile()
+        try:
+            validator.validate(value)
+        except ValidationError as e:
+            with self.assertRaisesRegex(ValidationError, "^" + re.escape(e.message) + "$"):
+                check(value)
+        else:
+            self.assertIsNone(check(value))
+
+    def test_valid_values(self):
+        self.assertSameResult(self.schema, {"topic": "Budget", "mentions": 3})
+        self.assertSameResult(self.schema, {"topic": "Budget", "mentions": 0, "tags": ["a", "b"]})
+        self.assertSameResult(Schema.array(self.schema), [])
+        self.assertSameResult(Schema.string().optional(), None)
+
+    def test_invalid_values_have_same_messages(self):
+        array = Schema.array(self.schema)
+        self.assertSameResult(array, "not a list")
+        self.assertSameResult(array, [{"topic": "Budget", "mentions": 1}, {"topic": "", "mentions": 1}])
+        self.assertSameResult(self.schema, {"topic": "Budget"})
+        self.assertSameResult(self.schema, {"topic": "Budget", "mentions": -1})
+        self.assertSameResult(self.schema, {"topic": "Budget", "mentions": 1, "extra": True})
+        self.assertSameResult(self.schema, {"topic": "Budget", "mentions": 1, "tags": [1]})
+
+    def test_allow_unknown_and_optional_object(self):
+        validator = Schema.object({"name": Schema.string()}).allow_unknown().optional()
+        check = validator.compile()
+        self.assertIsNone(check({"name": "John", "age": 30}))
+        self.assertIsNone(check(None))
+
+    def test_compiled_function_is_a_snapshot(self):
+        validator = Schema.string()
+        check = validator.compile()
+        validator.min_length(5)
+        self.assertIsNone(check("hi"))
+
+
 class TestValidationError(unittest.TestCase):
     def test_validation_error_message(self):
         error = ValidationError("Test message")
@@ -0,0 +1,103 @@
+import json
+import unittest
+
+from token_budget import (
+    MAX_CACHED_SEGMENT,
+    MIN_OUTPUT_TOKENS,
+    TokenUsage,
+    count_message_tokens,
+    count_tokens,
+    output_budget,
+    pack,
+    pack_json,
+    truncate_to_tokens,
+    _count_cached_segment,
+)
+
+
+class TestCountTokens(unittest.TestCase):
+    def test_words_and_punctuation(self):
+        self.assertEqual(count_tokens(""), 0)
+        self.assertEqual(count_tokens("Hello, world!"), 4)
+        self.assertEqual(count_tokens("The quick brown fox jumps over the lazy dog."), 10)
+
+    def test_long_words_and_numbers(self):
+        self.assertEqual(count_tokens("internationalization"), 4)
+        self.assertEqual(count_tokens("1234567"), 3)
+
+    def test_non_ascii_letters_count_per_character(self):
+        text = "会议讨论了预算和时间表" * 10
+        self.assertGreaterEqual(count_tokens(text), len(text))
+        self.assertGreaterEqual(count_tokens("Мы обсудили бюджет"), len("Мыобсудилибюджет"))
+        self.assertEqual(count_tokens("café"), 2)
+
+    def test_whole_documents_are_not_cached(self):
+        _count_cached_segment.cache_clear()
+        document = "word " * (MAX_CACHED_SEGMENT // 2)
+        self.assertEqual(count_tokens(document), count_tokens(document))
+        self.assertEqual(_count_cached_segment.cache_info().currsize, 0)
+        count_tokens("One sentence. Another one.")
+        self.assertEqual(_count_cached_segment.cache_info().currsize, 2)
+
+    def test_messages_include_overhead(self):
+        messages = [{"role": "system", "content": "Hello, world!"}, {"role": "user", "content": ""}]
+        self.assertEqual(count_message_tokens(messages), 4 + 2 * 4 + 3)
+
+
+class TestTruncate(unittest.TestCase):
+    def test_short_text_is_unchanged(self):
+        self.assertEqual(truncate_to_tokens("one two three", 10), "one two three")
+
+    def test_cuts_between_words(self):
+        text = " ".join(f"word{i}" for i in range(100))
+        truncated = truncate_to_tokens(text, 20)
+        self.assertLessEqual(count_tokens(truncated), 20)
+        self.assertTrue(text.startswith(truncated))
+        self.assertRegex(truncated, r"word\d+$")
+
+    def test_prefers_sentence_end(self):
+        text = "One two three. Four five six seven. Eight nine ten eleven twelve"
+        self.assertEqual(truncate_to_tokens(text, 9), "One two three. Four five six seven.")
+
+
+class TestPack(unittest.TestCase):
+    def test_packs_prefix_within_budget(self):
+        items = ["alpha beta"] * 10
+        self.assertEqual(len(pack(items, 9)), 3)
+        self.assertEqual(pack(items, 1000), items)
+        self.assertEqual(pack(items, 0), [])
+
+    def test_pack_json_fits(self):
+        rows = [{"name": f"Product {i}", "price": i * 10.5} for i in range(50)]
+        packed = pack_json(rows, 100)
+        self.assertTrue(0 < len(packed) < len(rows))
+        self.assertLessEqual(count_tokens(json.dumps(packed)), 100)
+        self.assertEqual(packed, rows[:len(packed)])
+
+
+class TestOutputBudget(unittest.TestCase):
+    def test_limits(self):
+        self.assertEqual(output_budget(100, 300), 300)
+        self.assertEqual(output_budget(900, 300, context_window=1000), 100)
+        self.assertEqual(output_budget(2000, 300, context_window=1000), MIN_OUTPUT_TOKENS)
+
+
+class TestTokenUsage(unittest.TestCase):
+    def test_records_per_call(self):
+        class Usage:
+            prompt_tokens = 90
+            completion_tokens = 40
+
+        class Response:
+            usage = Usage()
+
+        usage = TokenUsage()
+        usage.record("topics", estimated_prompt=100, max_tokens=200, response=Response())
+        usage.record("topics", estimated_prompt=50, max_tokens=100)
+        self.assertEqual(usage.summary(), {"topics": {
+            "calls": 2, "estimated_prompt": 150, "max_tokens": 300, "prompt_tokens": 90, "completion_tokens": 40,
+        }})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import json
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+CONTEXT_WINDOW = 128000
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+MIN_OUTPUT_TOKENS = 16
+TOKEN_CACHE_SIZE = 4096
+MAX_CACHED_SEGMENT = 1000
+
+# Pieces that a BPE tokenizer usually keeps together: a word with its leading space,
+# up to three digits, a run of punctuation, or a run of whitespace.
+_PIECE_RE = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+|_+")
+# Split after sentence ends and newlines, so token counts are cached per sentence, not per document
+_SEGMENT_RE = re.compile(r"(?<=[.!?\n\u3002\uff01\uff1f])(?![.!?\n\u3002\uff01\uff1f])")
+
+
+def _piece_tokens(piece: str) -> int:
+    """
+    Approximate tokens of one piece: ASCII words cost one token per six letters, other
+    letters (CJK, Cyrillic, accented) one token each, punctuation runs one per two characters.
+    """
+    word = piece.lstrip(" ")
+    if word[:1].isalpha():
+        ascii_letters = len(word.encode("ascii", "ignore"))
+        other_letters = len(word) - ascii_letters
+        return (1 + (ascii_letters - 1) // 6 if ascii_letters else 0) + other_letters
+    if word[:1].isspace() or word[:1].isdigit():
+        return 1
+    return (len(word) + 1) // 2
+
+
+def _count_segment(segment: str) -> int:
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(segment))
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _count_cached_segment(segment: str) -> int:
+    return _count_segment(segment)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximates the number of tokens of text for GPT models, without a tokenizer download.
+    ASCII words count as one token per six letters, other letters (e.g. CJK or Cyrillic) as
+    one token each, numbers as one token per three digits, and punctuation as one token per
+    two characters. This is rather too high than too low, so packed prompts stay within budget.
+    Counts are cached per sentence (up to MAX_CACHED_SEGMENT characters), so repeated prompt
+    parts are counted once without keeping whole documents alive in the cache.
+    """
+    return sum(
+        _count_cached_segment(segment) if len(segment) <= MAX_CACHED_SEGMENT else _count_segment(segment)
+        for segment in _SEGMENT_RE.split(text) if segment
+    )
+
+
+def count_message_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Approximates the prompt tokens of chat messages, including the per-message overhead."""
+    return sum(count_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages) + REPLY_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Returns the longest start of text that fits in max_tokens, cut between words
+    (at the end of a sentence if one ends in the last fifth of the kept text).
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    used = 0
+    end = 0
+    for match in _PIECE_RE.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            break
+        end = match.end()
+    kept = text[:end].rstrip()
+    sentence_end = max(kept.rfind(". "), kept.rfind(".\n"), kept.rfind("? "), kept.rfind("! "))
+    if sentence_end >= len(kept) * 0.8:
+        kept = kept[:sentence_end + 1]
+    return kept
+
+
+def pack(items: Iterable[T], max_tokens: int, render: Callable[[T], str] = str) -> List[T]:
+    """
+    Returns the items, in order, that fit in max_tokens when rendered with render(item).
+    Stops at the first item that does not fit, so the packed items are always a prefix.
+    """
+    packed: List[T] = []
+    used = 0
+    for item in items:
+        used += count_tokens(render(item)) + 1
+        if used > max_tokens:
+            break
+        packed.append(item)
+    return packed
+
+
+def pack_json(items: Sequence[Dict[str, Any]], max_tokens: int) -> List[Dict[str, Any]]:
+    """Packs JSON objects (e.g. dataset rows) so that json.dumps(result) fits in max_tokens."""
+    return pack(items, max_tokens - 2, render=lambda item: json.dumps(item) + ", ")
+
+
+def output_budget(prompt_tokens: int, wanted: int, context_window: int = CONTEXT_WINDOW) -> int:
+    """Chooses max_tokens for a reply: what the caller expects to need, limited to the room
+    left in the context window after the prompt, and never below MIN_OUTPUT_TOKENS."""
+    return max(MIN_OUTPUT_TOKENS, min(wanted, context_window - prompt_tokens))
+
+
+class TokenUsage:
+    """
+    Thread-safe per-call record of tokens: the estimated prompt tokens, the max_tokens
+    that were requested, and the prompt and completion tokens reported by the API.
+
+    Usage example:
+    --------------
+    >>> usage = TokenUsage()
+    >>> usage.record("topics", estimated_prompt=120, max_tokens=180)
+    >>> usage.summary()["topics"]["calls"]
+    1
+    """
+
+    FIELDS = ("calls", "estimated_prompt", "max_tokens", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call: str, estimated_prompt: int, max_tokens: int, response: Optional[Any] = None) -> None:
+        """Records one API call; response is the chat completion, if its usage should be added."""
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            totals = self._calls.setdefault(call, dict.fromkeys(self.FIELDS, 0))
+            totals["calls"] += 1
+            totals["estimated_prompt"] += estimated_prompt
+            totals["max_tokens"] += max_tokens
+            if usage is not None:
+                totals["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                totals["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Returns the token totals per call name."""
+        with self._lock:
+            return {call: dict(totals) for call, totals in self._calls.items()}
@@ -1,24 +1,69 @@
 import sys
 import os
-from typing import Optional, Dict
+import re
+import csv
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Dict, TextIO, Tuple
 from dotenv import load_dotenv
 import openai
+from report_cache import ReportCache, make_cache_key
+
+# Token budgeting and the shared OpenAI client are shared with the other apps and live in task_8
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'task_8'))
+from token_budget import TokenUsage, count_message_tokens, output_budget, truncate_to_tokens  # noqa: E402
+import openai_client  # noqa: E402
 
 MODEL_NAME = "gpt-4.1-mini"
+TEMPERATURE = 0.7
+HTTP_TIMEOUT = 60.0
+HTTP_MAX_CONNECTIONS = 64
+SERVICE_INPUT_TOKENS = 2000
+SECTION_OUTPUT_TOKENS = 110
+SECTION_MAX_TOKENS = 250
+ERROR_PREFIX = "**Error generating report:**"
+BATCH_WORKERS = 8
+BATCH_OUT_DIR = "reports"
+PROGRESS_FILE = "progress.jsonl"
+CACHE_DIR = Path('.cache') / 'reports'
+CACHE_MAX_ENTRIES = 1000
+CACHE_TTL_HOURS = 24 * 7
+# Report sections and what each should cover, in report order
+REPORT_SECTIONS = {
+    "Brief History": "Founding year, milestones, etc.",
+    "Target Audience": "Primary user segments",
+    "Core Features": "Top 2–4 key functionalities",
+    "Unique Selling Points": "Key differentiators",
+    "Business Model": "How the service makes money",
+    "Tech Stack Insights": "Any hints about technologies used",
+    "Perceived Strengths": "Mentioned positives or standout features",
+    "Perceived Weaknesses": "Cited drawbacks or limitations",
+}
+# Room for every section of the full report, plus the headings. This stays fixed: the report's
+# length is set by its sections, not by the input, so only the context window can lower it.
+REPORT_MAX_TOKENS = len(REPORT_SECTIONS) * SECTION_OUTPUT_TOKENS + 20
 PROMPT_TEMPLATE = (
     "You are an expert product analyst. Given the following service or product, generate a concise, markdown-formatted report with the following sections: "
-    "\n- Brief History: Founding year, milestones, etc."
-    "\n- Target Audience: Primary user segments"
-    "\n- Core Features: Top 2–4 key functionalities"
-    "\n- Unique Selling Points: Key differentiators"
-    "\n- Business Model: How the service makes money"
-    "\n- Tech Stack Insights: Any hints about technologies used"
-    "\n- Perceived Strengths: Mentioned positives or standout features"
-    "\n- Perceived Weaknesses: Cited drawbacks or limitations"
-    "\nEach section should be clearly labeled as a markdown heading (## Section Name)."
+    + "".join(f"\n- {name}: {focus}" for name, focus in REPORT_SECTIONS.items())
+    + "\nEach section should be clearly labeled as a markdown heading (## Section Name)."
+    "\nIf information is not available, state 'Not enough public information.'"
+)
+SECTION_PROMPT_TEMPLATE = (
+    "You are an expert product analyst. Given the following service or product, write only the '{name}' section "
+    "of a concise, markdown-formatted report. It should cover: {focus}."
+    "\nStart with the heading '## {name}' and keep the section short (a few sentences or 2–5 bullet points)."
     "\nIf information is not available, state 'Not enough public information.'"
 )
 
+class ReportError(Exception):
+    """Raised when the API call for a report or section fails."""
+
 def get_input() -> str:
     """Prompt the user for service name or description."""
     print("Enter a known service name (e.g., 'Spotify', 'Notion') or paste a raw service description. Press Enter when done:")
@@ -51,28 +96,224 @@ def prompt_filename() -> str:
         sys.exit(1)
     return filename
 
-def generate_report_with_openai(system_prompt: str, user_content: str, api_key: str) -> str:
-    """Generate a report using OpenAI's chat completion API."""
-    client = openai.OpenAI(api_key=api_key)
+# Estimated and reported tokens of every API call, by call name ('report' or 'section')
+_token_usage = TokenUsage()
+
+def configure_http(timeout: float = HTTP_TIMEOUT, max_connections: int = HTTP_MAX_CONNECTIONS) -> None:
+    """Set the request timeout and connection pool size of the shared OpenAI client."""
+    openai_client.configure_client(timeout=timeout, max_connections=max_connections, max_keepalive=max_connections)
+
+def get_client(api_key: str) -> openai.OpenAI:
+    """Return the shared OpenAI client (task_8/openai_client.py) for the API key, creating it on first use.
+    Reusing one client keeps its pooled HTTP connections (and TLS sessions) alive between reports."""
+    openai_client.configure_client(api_key=api_key)
+    return openai_client.get_client()
+
+def fit_service_input(service_info: str) -> str:
+    """Cut a long pasted description to SERVICE_INPUT_TOKENS, between sentences."""
+    return truncate_to_tokens(service_info, SERVICE_INPUT_TOKENS)
+
+def budget_request(system_prompt: str, user_content: str, max_tokens: int) -> Tuple[List[Dict[str, str]], int, int]:
+    """Build the messages and return them with their estimated prompt tokens and the max_tokens
+    to request: max_tokens, limited to the room left in the context window."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content}
+    ]
+    prompt_tokens = count_message_tokens(messages)
+    return messages, prompt_tokens, output_budget(prompt_tokens, max_tokens)
+
+def generate_report_with_openai(system_prompt: str, user_content: str, api_key: str, max_tokens: int = REPORT_MAX_TOKENS,
+                                call: str = 'report') -> str:
+    """Generate a report using OpenAI's chat completion API. `call` names the request in the token usage.
+    Raises ReportError if the request fails."""
+    client = get_client(api_key)
+    messages, prompt_tokens, max_tokens = budget_request(system_prompt, user_content, max_tokens)
     try:
         response = client.chat.completions.create(
             model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            max_tokens=900,
-            temperature=0.7,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=TEMPERATURE,
         )
+        _token_usage.record(call, prompt_tokens, max_tokens, response)
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"Error generating report: {e}", file=sys.stderr)
-        return f"**Error generating report:** {e}"
+        raise ReportError(str(e)) from e
+
+def stream_report_with_openai(system_prompt: str, user_content: str, api_key: str) -> Iterator[str]:
+    """Yield the report text as the tokens arrive (chat completion with stream=True)."""
+    client = get_client(api_key)
+    messages, prompt_tokens, max_tokens = budget_request(system_prompt, user_content, REPORT_MAX_TOKENS)
+    _token_usage.record('report', prompt_tokens, max_tokens)
+    stream = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=messages,
+        max_tokens=max_tokens,
+        temperature=TEMPERATURE,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def iter_sections(deltas: Iterable[str]) -> Iterator[str]:
+    """Group streamed text into markdown sections. A section is yielded as soon as the next
+    `## ` heading (or the end of the stream) shows it is complete; text before the first
+    heading is yielded on its own."""
+    section: List[str] = []
+    pending = ''
+    for delta in deltas:
+        pending += delta
+        while '\n' in pending:
+            line, pending = pending.split('\n', 1)
+            if line.startswith('## ') and ''.join(section).strip():
+                yield ''.join(section)
+                section = []
+            section.append(line + '\n')
+    if pending.startswith('## ') and ''.join(section).strip():
+        yield ''.join(section)
+        section = []
+    section.append(pending)
+    if ''.join(section).strip():
+        yield ''.join(section)
+
+def postprocess_section(section: str) -> str:
+    """Tidy one section before it is written."""
+    return section.strip()
+
+_cache: Dict[str, Any] = {'store': None, 'stale_while_revalidate': False}
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+def configure_cache(enabled: bool = True, cache_dir: Path = CACHE_DIR, max_entries: int = CACHE_MAX_ENTRIES,
+                    ttl_hours: float = CACHE_TTL_HOURS, stale_while_revalidate: bool = False) -> None:
+    """Enable the persistent report cache, or disable it."""
+    _cache['store'] = ReportCache(cache_dir, max_entries, ttl_hours * 3600) if enabled else None
+    _cache['stale_while_revalidate'] = stale_while_revalidate
+
+def generate_and_cache(key: str, system_prompt: str, user_content: str, api_key: str, max_tokens: int = REPORT_MAX_TOKENS,
+                       call: str = 'report') -> str:
+    """Generate a report and store it in the cache (failures raise ReportError and are not cached)."""
+    report = generate_report_with_openai(system_prompt, user_content, api_key, max_tokens, call)
+    if _cache['store'] is not None:
+        _cache['store'].put(key, report, model=MODEL_NAME)
+    return report
+
+def refresh_in_background(key: str, system_prompt: str, user_content: str, api_key: str, max_tokens: int = REPORT_MAX_TOKENS,
+                          call: str = 'report') -> None:
+    """Regenerate an expired report on a background thread (at most one refresh per key at a time).
+    The thread is not a daemon, so a short CLI run still finishes the refresh before exiting."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    def refresh() -> None:
+        try:
+            generate_and_cache(key, system_prompt, user_content, api_key, max_tokens, call)
+        except ReportError:
+            pass  # already logged; the stale report stays until the next refresh
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+    threading.Thread(target=refresh, name=f"refresh-{key[:8]}").start()
+
+def lookup_cached_report(key: str, system_prompt: str, user_content: str, api_key: str, max_tokens: int = REPORT_MAX_TOKENS,
+                         call: str = 'report') -> Optional[str]:
+    """Return the cached report if it is fresh, or if it expired and stale-while-revalidate is on
+    (a background refresh is started then); otherwise None."""
+    report, fresh = _cache['store'].get(key)
+    if report is not None and (fresh or _cache['stale_while_revalidate']):
+        if not fresh:
+            refresh_in_background(key, system_prompt, user_content, api_key, max_tokens, call)
+        return report
+    return None
 
-def analyze_service(service_info: str, api_key: str) -> Dict[str, str]:
-    """Analyze the service and return the markdown report."""
-    analysis = generate_report_with_openai(PROMPT_TEMPLATE, service_info, api_key)
-    return {"service": service_info, "report": analysis}
+def get_report(system_prompt: str, user_content: str, api_key: str, max_tokens: int = REPORT_MAX_TOKENS,
+               call: str = 'report') -> str:
+    """Return the report from the cache if fresh, otherwise generate (and cache) it.
+    With stale-while-revalidate, an expired report is returned at once and refreshed in the background.
+    Raises ReportError if the report has to be generated and the request fails."""
+    if _cache['store'] is None:
+        return generate_report_with_openai(system_prompt, user_content, api_key, max_tokens, call)
+    key = make_cache_key(user_content, MODEL_NAME, system_prompt, TEMPERATURE)
+    report = lookup_cached_report(key, system_prompt, user_content, api_key, max_tokens, call)
+    if report is not None:
+        return report
+    return generate_and_cache(key, system_prompt, user_content, api_key, max_tokens, call)
+
+def stream_markdown_report(service_info: str, api_key: str, out: TextIO) -> Dict[str, Any]:
+    """Write the markdown report to `out` section by section while it is being generated,
+    flushing after each section. The output matches generate_markdown_report. A cached report
+    is written at once. Returns the report text, section count, time to first section and total time."""
+    start = time.perf_counter()
+    service_info = fit_service_input(service_info)
+    store = _cache['store']
+    key = make_cache_key(service_info, MODEL_NAME, PROMPT_TEMPLATE, TEMPERATURE)
+    cached = lookup_cached_report(key, PROMPT_TEMPLATE, service_info, api_key) if store is not None else None
+    deltas = [cached] if cached is not None else stream_report_with_openai(PROMPT_TEMPLATE, service_info, api_key)
+    out.write("# Service Analysis Report\n\n")
+    sections: List[str] = []
+    first_section: Optional[float] = None
+    failed = False
+    try:
+        for section in iter_sections(deltas):
+            text = postprocess_section(section)
+            out.write(("\n\n" if sections else "") + text)
+            out.flush()
+            sections.append(text)
+            if first_section is None:
+                first_section = time.perf_counter() - start
+    except Exception as e:
+        print(f"Error generating report: {e}", file=sys.stderr)
+        out.write(("\n\n" if sections else "") + f"{ERROR_PREFIX} {e}")
+        failed = True
+    out.write("\n")
+    out.flush()
+    report = "\n\n".join(sections)
+    if store is not None and cached is None and not failed and report:
+        store.put(key, report, model=MODEL_NAME)
+    return {
+        "report": report,
+        "sections": len(sections),
+        "cached": cached is not None,
+        "first_section_sec": round(first_section, 3) if first_section is not None else None,
+        "total_sec": round(time.perf_counter() - start, 3),
+    }
+
+def analyze_service(service_info: str, api_key: str) -> Dict[str, Optional[str]]:
+    """Analyze the service and return the markdown report. If generation failed, the report
+    holds the error message and `error` is set (it is None otherwise)."""
+    try:
+        analysis = get_report(PROMPT_TEMPLATE, fit_service_input(service_info), api_key)
+    except ReportError as e:
+        return {"service": service_info, "report": f"{ERROR_PREFIX} {e}", "error": str(e)}
+    return {"service": service_info, "report": analysis, "error": None}
+
+def generate_section(name: str, service_info: str, api_key: str) -> str:
+    """Generate (or fetch from the cache) one report section. Each section has its own prompt,
+    so its cache entry only changes when that section's prompt does. Raises ReportError on failure."""
+    prompt = SECTION_PROMPT_TEMPLATE.format(name=name, focus=REPORT_SECTIONS[name])
+    section = get_report(prompt, fit_service_input(service_info), api_key, SECTION_MAX_TOKENS, call='section').strip()
+    if not section.startswith('## '):
+        section = f"## {name}\n{section}"
+    return section
+
+def analyze_service_by_section(service_info: str, api_key: str) -> Dict[str, Optional[str]]:
+    """Analyze the service with one short request per section, all run concurrently,
+    and return the sections in report order (same shape as analyze_service). A failed
+    section is replaced by its error message, and `error` names the first failure."""
+    def section_or_error(name: str) -> Tuple[str, Optional[str]]:
+        try:
+            return generate_section(name, service_info, api_key), None
+        except ReportError as e:
+            return f"## {name}\n{ERROR_PREFIX} {e}", f"{name}: {e}"
+    with ThreadPoolExecutor(max_workers=len(REPORT_SECTIONS)) as pool:
+        results = list(pool.map(section_or_error, REPORT_SECTIONS))
+    errors = [error for _, error in results if error is not None]
+    return {"service": service_info, "report": "\n\n".join(section for section, _ in results),
+            "error": errors[0] if errors else None}
 
 def generate_markdown_report(analysis_dict: Dict[str, str]) -> str:
     """Format the analysis as a markdown report."""
@@ -83,14 +324,161 @@ def generate_markdown_report(analysis_dict: Dict[str, str]) -> str:
     ]
     return '\n'.join(report)
 
+def load_batch_items(path: Path) -> List[Dict[str, str]]:
+    """Read services from a CSV (columns 'name' and/or 'description') or JSONL file (same keys per line).
+    Each item gets the text sent to the model and a key derived from that text. JSONL lines that are
+    not valid JSON objects are skipped and reported with their line number."""
+    if path.suffix.lower() == '.jsonl':
+        rows = []
+        with path.open('r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    print(f"{path}:{line_number}: skipped, not valid JSON ({e})", file=sys.stderr)
+                    continue
+                if not isinstance(row, dict):
+                    print(f"{path}:{line_number}: skipped, expected an object, got {type(row).__name__}", file=sys.stderr)
+                    continue
+                rows.append(row)
+    else:
+        with path.open('r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    items = []
+    for row in rows:
+        name = str(row.get('name') or '').strip()
+        description = str(row.get('description') or '').strip()
+        service_info = f"{name}\n{description}" if name and description else name or description
+        if not service_info:
+            continue
+        key = hashlib.sha256(service_info.encode('utf-8')).hexdigest()[:16]
+        items.append({"name": name or description[:40], "service_info": service_info, "key": key})
+    return items
+
+def report_filename(item: Dict[str, str]) -> str:
+    """Return a file name for the item's report: a slug of the name plus the item key."""
+    slug = re.sub(r'[^a-z0-9]+', '-', item['name'].lower()).strip('-')[:50] or 'service'
+    return f"{slug}-{item['key'][:8]}.md"
+
+def load_progress(progress_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Return the last recorded status per item key from the progress log."""
+    progress: Dict[str, Dict[str, Any]] = {}
+    if progress_path.exists():
+        with progress_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    progress[entry['key']] = entry
+                except (ValueError, KeyError):
+                    continue
+    return progress
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write text to a temporary file next to path and rename it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def run_batch(input_path: Path, out_dir: Path, api_key: str, workers: int = BATCH_WORKERS,
+              analyze: Callable[[str, str], Dict[str, str]] = analyze_service) -> Dict[str, Any]:
+    """Generate a report for every service in the input file, with at most `workers` requests in flight.
+    Each report is written as soon as it completes and recorded in progress.jsonl, so an interrupted
+    run can be restarted and skips the services already done. Failed services are retried on the next run."""
+    items = load_batch_items(input_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    progress_path = out_dir / PROGRESS_FILE
+    progress = load_progress(progress_path)
+    pending = {item['key']: item for item in items if progress.get(item['key'], {}).get('status') != 'ok'}
+    skipped = len({item['key'] for item in items}) - len(pending)
+    print(f"{len(items)} services, {skipped} already done, {len(pending)} to generate with {workers} workers")
+    succeeded = failed = 0
+    start = time.perf_counter()
+    with progress_path.open('a', encoding='utf-8') as progress_file, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze, item['service_info'], api_key): item for item in pending.values()}
+        for done, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            entry = {"key": item['key'], "name": item['name']}
+            filename = report_filename(item)
+            try:
+                analysis = future.result()
+                error = analysis.get('error')
+                if not error:
+                    write_atomic(out_dir / filename, generate_markdown_report(analysis))
+            except Exception as e:
+                # Any other failure (cache, disk) only fails this service, not the batch
+                error = f"{type(e).__name__}: {e}"
+            if error:
+                failed += 1
+                entry.update(status='failed', error=error)
+                status = f"FAILED ({error})"
+            else:
+                succeeded += 1
+                entry.update(status='ok', file=filename)
+                status = filename
+            progress_file.write(json.dumps(entry) + "\n")
+            progress_file.flush()
+            elapsed = time.perf_counter() - start
+            rate = succeeded / (elapsed / 60) if elapsed > 0 else 0.0
+            print(f"[{done}/{len(pending)}] {item['name']}: {status} ({rate:.1f} reports/min)")
+    elapsed = time.perf_counter() - start
+    summary = {
+        "services": len(items),
+        "skipped": skipped,
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed_sec": round(elapsed, 2),
+        "reports_per_minute": round(succeeded / (elapsed / 60), 2) if elapsed > 0 else 0,
+        "tokens": _token_usage.summary(),
+    }
+    print(json.dumps(summary, indent=2))
+    return summary
+
+def print_token_usage() -> None:
+    """Print the tokens used by the API calls of this run (nothing if all reports were cached)."""
+    for call, tokens in _token_usage.summary().items():
+        print(f"Tokens ({call}): {tokens['calls']} calls, {tokens['estimated_prompt']} estimated prompt, "
+              f"{tokens['prompt_tokens']} prompt and {tokens['completion_tokens']} completion reported "
+              f"(max_tokens {tokens['max_tokens']})", file=sys.stderr)
+
 def main():
     """Main entry point for the application."""
+    parser = argparse.ArgumentParser(description="Generate markdown analysis reports for digital services.")
+    parser.add_argument('--batch', type=Path, metavar='FILE', help='CSV or JSONL file of services (name, description) to analyze in one run')
+    parser.add_argument('--out-dir', type=Path, default=Path(BATCH_OUT_DIR), help='Folder for batch reports and progress')
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS, help='Reports generated concurrently in batch mode')
+    parser.add_argument('--stream', action='store_true', help='Write the report section by section as it is generated')
+    parser.add_argument('--sections', action='store_true', help='Generate each section with its own concurrent request (cached per section)')
+    parser.add_argument('--no-cache', action='store_true', help='Always generate a new report')
+    parser.add_argument('--cache-dir', type=Path, default=CACHE_DIR, help='Folder of the report cache')
+    parser.add_argument('--cache-ttl-hours', type=float, default=CACHE_TTL_HOURS, help='Hours before a cached report expires')
+    parser.add_argument('--cache-max-entries', type=int, default=CACHE_MAX_ENTRIES, help='Cached reports kept (least recently used are evicted)')
+    parser.add_argument('--stale-while-revalidate', action='store_true',
+                        help='Return an expired cached report immediately and refresh it in the background')
+    parser.add_argument('--http-timeout', type=float, default=HTTP_TIMEOUT, help='Timeout in seconds for each API request')
+    parser.add_argument('--max-connections', type=int, default=HTTP_MAX_CONNECTIONS,
+                        help='Size of the shared HTTP connection pool (at least --workers, or 8 with --sections)')
+    args = parser.parse_args()
+    if args.stream and args.sections:
+        parser.error("--stream and --sections cannot be combined")
+    analyze = analyze_service_by_section if args.sections else analyze_service
+    configure_http(args.http_timeout, args.max_connections)
+    configure_cache(not args.no_cache, args.cache_dir, args.cache_max_entries, args.cache_ttl_hours, args.stale_while_revalidate)
     load_dotenv()
     api_key = os.getenv('TOKEN')
     if not api_key:
         print("OpenAI API token not found in .env as TOKEN. Exiting.", file=sys.stderr)
         sys.exit(1)
 
+    if args.batch:
+        if not args.batch.is_file():
+            print(f"Batch file not found: {args.batch}", file=sys.stderr)
+            sys.exit(1)
+        run_batch(args.batch, args.out_dir, api_key, max(1, args.workers), analyze)
+        return
+
     output_mode = prompt_output_mode()
     filename: Optional[str] = None
     if output_mode == '2':
@@ -100,9 +488,28 @@ def main():
     if not service_info:
         print("No input provided. Exiting.", file=sys.stderr)
         sys.exit(1)
+    if args.stream:
+        if output_mode == '1':
+            print("\n--- Markdown Report ---\n")
+            stats = stream_markdown_report(service_info, api_key, sys.stdout)
+        else:
+            try:
+                with open(filename, 'w', encoding='utf-8') as f:
+                    stats = stream_markdown_report(service_info, api_key, f)
+                print(f"Report saved to {filename}")
+            except OSError as e:
+                print(f"Failed to save file: {e}", file=sys.stderr)
+                sys.exit(1)
+        print(f"\nTime to first section: {stats['first_section_sec']}s, total: {stats['total_sec']}s "
+              f"({stats['sections']} sections{', cached' if stats['cached'] else ''})", file=sys.stderr)
+        print_token_usage()
+        return
+
     print("\nGenerating AI-powered analysis. Please wait...\n")
-    analysis = analyze_service(service_info, api_key)
+    start = time.perf_counter()
+    analysis = analyze(service_info, api_key)
     report = generate_markdown_report(analysis)
+    elapsed = time.perf_counter() - start
 
     if output_mode == '1':
         print("\n--- Markdown Report ---\n")
@@ -114,6 +521,8 @@ def main():
             print(f"Report saved to {filename}")
         except Exception as e:
             print(f"Failed to save file: {e}", file=sys.stderr)
+    print(f"Generated in {elapsed:.2f}s", file=sys.stderr)
+    print_token_usage()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from dotenv import load_dotenv
+
+import app
+
+
+def time_runs(label: str, fn: Callable[[str], object], services: List[str], repeats: int) -> Dict[str, object]:
+    """Time fn once per service per repeat and return the latency statistics."""
+    latencies = []
+    for _ in range(repeats):
+        for service in services:
+            start = time.perf_counter()
+            fn(service)
+            latencies.append(time.perf_counter() - start)
+    return {
+        "mode": label,
+        "runs": len(latencies),
+        "mean_sec": round(statistics.mean(latencies), 3),
+        "median_sec": round(statistics.median(latencies), 3),
+        "max_sec": round(max(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare end-to-end latency of one monolithic report request with per-section concurrent requests.")
+    parser.add_argument('services', nargs='*', default=['Spotify', 'Notion', 'Slack'], help='Services to analyze')
+    parser.add_argument('--repeats', type=int, default=1, help='Runs per service and mode')
+    args = parser.parse_args()
+    load_dotenv()
+    api_key = os.getenv('TOKEN')
+    if not api_key:
+        print("OpenAI API token not found in .env as TOKEN. Exiting.", file=sys.stderr)
+        sys.exit(1)
+
+    def sectioned(service: str) -> str:
+        return app.generate_markdown_report(app.analyze_service_by_section(service, api_key))
+
+    def monolithic(service: str) -> str:
+        return app.generate_markdown_report(app.analyze_service(service, api_key))
+
+    app.configure_cache(enabled=False)
+    results = [
+        time_runs("monolithic", monolithic, args.services, args.repeats),
+        time_runs("sections (uncached)", sectioned, args.services, args.repeats),
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        app.configure_cache(cache_dir=Path(cache_dir))
+        for service in args.services:
+            sectioned(service)
+        # Changing one section's prompt only regenerates that section
+        app.REPORT_SECTIONS["Business Model"] += " (revenue streams and pricing)"
+        results.append(time_runs("sections (one prompt changed)", sectioned, args.services, 1))
+    print(json.dumps({"services": args.services, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+# The size-bounded LRU directory is shared with task_11 and lives in task_8
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'task_8'))
+from dir_lru import DirectoryLRU  # noqa: E402
+
+
+def normalize_service_text(text: str) -> str:
+    """Normalize service input so trivially different spellings share a cache entry
+    ("  Spotify\\n" and "spotify" give the same key)."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFKC', text)).strip().casefold()
+
+
+def make_cache_key(service_text: str, model: str, prompt: str, temperature: float) -> str:
+    """Key a report on the normalized input, the model, a hash of the prompt template and the temperature."""
+    prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    parts = [normalize_service_text(service_text), model, prompt_hash, repr(float(temperature))]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """Persistent cache of generated reports, one JSON file per key under `root`.
+
+    Entries expire `ttl` seconds after they were generated. When more than `max_entries`
+    are stored, the least recently used ones (by file modification time, refreshed on
+    every hit) are deleted; the entry count is tracked incrementally, so a put does not
+    scan the folder. Writes are atomic, so concurrent runs can share the folder.
+    """
+
+    def __init__(self, root: Path, max_entries: int = 1000, ttl: float = 7 * 24 * 3600):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lru = DirectoryLRU(self.root, '*.json', max_entries=max_entries)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Tuple[Optional[str], bool]:
+        """Return (report, is_fresh); (None, False) on a miss. Expired entries are returned
+        with is_fresh=False, so the caller can decide whether to serve them while refreshing."""
+        path = self._path(key)
+        try:
+            with path.open('r', encoding='utf-8') as f:
+                entry = json.load(f)
+            report, created = entry['report'], float(entry['created'])
+            if not isinstance(report, str):
+                raise TypeError("report is not a string")
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, unreadable or malformed entries (e.g. `[]`, no 'created') are misses
+            return None, False
+        return report, time.time() - created < self.ttl
+
+    def put(self, key: str, report: str, **metadata: Any) -> None:
+        """Store a report atomically and evict least recently used entries over max_entries."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"report": report, "created": time.time(), **metadata}, f)
+        self._lru.replace(Path(tmp), self._path(key))
+
+    def evict(self) -> None:
+        """Delete the least recently used entries until at most max_entries remain."""
+        self._lru.evict()
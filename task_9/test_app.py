@@ -0,0 +1,33 @@
+import unittest
+
+from app import iter_sections
+
+class TestIterSections(unittest.TestCase):
+    def sections(self, deltas):
+        return list(iter_sections(deltas))
+
+    def test_splits_at_headings(self):
+        text = "## Brief History\nFounded in 2004.\n## Target Audience\nStudents.\n"
+        self.assertEqual(self.sections([text]), ["## Brief History\nFounded in 2004.\n", "## Target Audience\nStudents.\n"])
+
+    def test_deltas_split_mid_line_and_mid_heading(self):
+        text = "## Brief History\nFounded in 2004.\n## Target Audience\nStudents."
+        deltas = [text[i:i + 3] for i in range(0, len(text), 3)]
+        self.assertEqual(self.sections(deltas), ["## Brief History\nFounded in 2004.\n", "## Target Audience\nStudents."])
+
+    def test_text_before_first_heading_is_its_own_section(self):
+        self.assertEqual(self.sections(["Report\n## A\nx\n"]), ["Report\n", "## A\nx\n"])
+
+    def test_heading_on_the_last_line(self):
+        self.assertEqual(self.sections(["## A\nx\n## B"]), ["## A\nx\n", "## B"])
+
+    def test_subheadings_and_blank_lines_do_not_split(self):
+        text = "\n\n## A\n### detail\nx\n\n## B\ny"
+        self.assertEqual(self.sections([text]), ["\n\n## A\n### detail\nx\n\n", "## B\ny"])
+
+    def test_empty_stream(self):
+        self.assertEqual(self.sections([]), [])
+        self.assertEqual(self.sections(["", "\n  \n"]), [])
+
+if __name__ == '__main__':
+    unittest.main()